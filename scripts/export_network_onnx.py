@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Analytical-Intelligence v1 - Network Model ONNX Export
+Converts models/network/model.joblib to ONNX for the ONNX Runtime backend.
+
+One-time, offline step. Needs the converter packages, which are NOT part of
+the backend image:
+    pip install joblib onnx skl2onnx onnxmltools lightgbm scikit-learn
+
+The backend picks the export up automatically when it exists at
+NETWORK_ONNX_PATH (default: models/network/model.onnx) and onnxruntime is
+installed; otherwise it keeps using the joblib model. The export records the
+sha256 of the bundle it was made from, so re-run this script whenever
+model.joblib changes - a stale export is ignored.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import joblib
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+NETWORK_MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "models", "network")
+
+
+def convert(model, n_features: int):
+    """Convert a LightGBM Booster or sklearn classifier to an ONNX model."""
+    # Probabilities must come out as a plain (N, C) tensor, not a list of dicts (zipmap)
+    if type(model).__name__ == "Booster":
+        from onnxmltools import convert_lightgbm
+        from onnxmltools.convert.common.data_types import FloatTensorType
+
+        return convert_lightgbm(
+            model,
+            initial_types=[("input", FloatTensorType([None, n_features]))],
+            zipmap=False,
+        )
+
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    return convert_sklearn(
+        model,
+        initial_types=[("input", FloatTensorType([None, n_features]))],
+        options={id(model): {"zipmap": False}},
+    )
+
+
+def stamp_source(path: str, model_path: str) -> None:
+    """
+    Record the source bundle's sha256 in the export's metadata. The backend
+    ignores exports whose recorded hash does not match the current bundle.
+    """
+    import onnx
+
+    with open(model_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    onnx_model = onnx.load(path)
+    entry = onnx_model.metadata_props.add()
+    entry.key = "source_sha256"
+    entry.value = digest
+    onnx.save(onnx_model, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the network ML model to ONNX")
+    parser.add_argument("--model", default=os.path.join(NETWORK_MODEL_DIR, "model.joblib"))
+    parser.add_argument("--features", default=os.path.join(NETWORK_MODEL_DIR, "feature_list.json"))
+    parser.add_argument("--output", default=os.path.join(NETWORK_MODEL_DIR, "model.onnx"))
+    args = parser.parse_args()
+
+    with open(args.features, "r") as f:
+        n_features = len(json.load(f))
+
+    print(f"Loading {args.model} ({n_features} features)...")
+    model = joblib.load(args.model)
+
+    try:
+        onnx_model = convert(model, n_features)
+    except ImportError as e:
+        print(f"ERROR: converter not installed: {e}")
+        sys.exit(1)
+
+    with open(args.output, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    stamp_source(args.output, args.model)
+
+    print(f"[✓] ONNX model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
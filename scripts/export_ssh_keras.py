@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Analytical-Intelligence v1 - SSH LSTM Keras Export
+Saves models/ssh/ssh_lstm.joblib as a native .keras file for the Keras backend.
+
+One-time, offline step:
+    pip install joblib tensorflow
+
+The backend loads ssh_lstm.keras (next to the joblib bundle) in one pass
+instead of rebuilding the model from JSON + weights. The export is paired
+with a .sha256 file holding the hash of the bundle it was made from, so
+re-run this script whenever ssh_lstm.joblib changes - a stale export is
+ignored. The joblib bundle is still read for the token vocabulary and
+thresholds.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+
+import joblib
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SSH_MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "models", "ssh")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the SSH LSTM model as a .keras file")
+    parser.add_argument("--model", default=os.path.join(SSH_MODEL_DIR, "ssh_lstm.joblib"))
+    args = parser.parse_args()
+
+    try:
+        from tensorflow.keras.models import model_from_json
+    except ImportError as e:
+        print(f"ERROR: tensorflow not installed: {e}")
+        sys.exit(1)
+
+    print(f"Loading {args.model}...")
+    bundle = joblib.load(args.model)
+
+    model = model_from_json(bundle["model_json"])
+    model.set_weights(bundle["weights"])
+
+    # The backend looks for the export next to the bundle
+    output = os.path.splitext(args.model)[0] + ".keras"
+    model.save(output)
+
+    with open(args.model, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with open(output + ".sha256", "w") as f:
+        f.write(digest + "\n")
+
+    print(f"[✓] Keras model written to {output}")
+
+
+if __name__ == "__main__":
+    main()
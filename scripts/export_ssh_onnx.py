@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Analytical-Intelligence v1 - SSH LSTM ONNX Export
+Converts models/ssh/ssh_lstm.joblib to ONNX for the ONNX Runtime backend.
+
+One-time, offline step. Needs the converter packages, which are NOT part of
+the backend image:
+    pip install joblib tensorflow tf2onnx onnx onnxruntime
+
+The backend picks the export up automatically when it exists at
+SSH_ONNX_PATH (default: models/ssh/ssh_lstm.onnx) and onnxruntime is
+installed; TensorFlow is then no longer needed at runtime. The joblib bundle
+is still read for the token vocabulary and thresholds. The export records
+the sha256 of the bundle it was made from, so re-run this script whenever
+ssh_lstm.joblib changes - a stale export is ignored.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+
+import joblib
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SSH_MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "models", "ssh")
+
+
+def convert(bundle):
+    """Rebuild the Keras model from the bundle and convert it to an ONNX model."""
+    import tensorflow as tf
+    import tf2onnx
+    from tensorflow.keras.models import model_from_json
+
+    model = model_from_json(bundle["model_json"])
+    model.set_weights(bundle["weights"])
+
+    # Keep the model's own input signature so the backend can feed it unchanged
+    model_input = model.inputs[0]
+    signature = [tf.TensorSpec(model_input.shape, model_input.dtype, name="tokens")]
+    onnx_model, _ = tf2onnx.convert.from_keras(model, input_signature=signature)
+    return onnx_model
+
+
+def quantize(path: str) -> None:
+    """Quantize weights to int8 in place (dynamic quantization, LSTM/MatMul kernels)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_path = path + ".fp32"
+    os.replace(path, tmp_path)
+    try:
+        quantize_dynamic(tmp_path, path, weight_type=QuantType.QInt8)
+    finally:
+        os.remove(tmp_path)
+
+
+def stamp_source(path: str, model_path: str) -> None:
+    """
+    Record the source bundle's sha256 in the export's metadata. The backend
+    ignores exports whose recorded hash does not match the current bundle.
+    """
+    import onnx
+
+    with open(model_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    onnx_model = onnx.load(path)
+    entry = onnx_model.metadata_props.add()
+    entry.key = "source_sha256"
+    entry.value = digest
+    onnx.save(onnx_model, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the SSH LSTM model to ONNX")
+    parser.add_argument("--model", default=os.path.join(SSH_MODEL_DIR, "ssh_lstm.joblib"))
+    parser.add_argument("--output", default=os.path.join(SSH_MODEL_DIR, "ssh_lstm.onnx"))
+    parser.add_argument("--quantize", action="store_true",
+                        help="Store weights as int8 (smaller and faster; re-check scores against the threshold)")
+    args = parser.parse_args()
+
+    print(f"Loading {args.model}...")
+    bundle = joblib.load(args.model)
+
+    try:
+        onnx_model = convert(bundle)
+    except ImportError as e:
+        print(f"ERROR: converter not installed: {e}")
+        sys.exit(1)
+
+    with open(args.output, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+    if args.quantize:
+        try:
+            quantize(args.output)
+        except ImportError as e:
+            print(f"ERROR: onnxruntime quantization not available: {e}")
+            sys.exit(1)
+
+    # Last, so quantization can't drop it
+    stamp_source(args.output, args.model)
+
+    print(f"[✓] ONNX model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Analytical-Intelligence v1 - Request Coalescing
+Shared buffering for work that is cheaper done for many requests at once.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Generic, List, Optional, Set, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+class Coalescer(ABC, Generic[Item, Result]):
+    """
+    Buffers items from concurrent callers and processes them in batches.
+    
+    Each caller awaits its own result. The buffer is flushed when it reaches
+    max_batch items or when the oldest buffered item has waited max_delay_ms,
+    so a lone item is delayed by at most max_delay_ms. Once drained (at
+    shutdown), items are processed as soon as they are submitted. Subclasses
+    implement process_batch, returning one result per item in order.
+    
+    With ordered=True, batches are processed one at a time in flush order,
+    for stateful work that must see items in arrival order. Otherwise batches
+    may overlap. If a batch fails with one of the retry_on exceptions, its
+    items are retried one per batch so a bad item only fails its own caller;
+    any other failure fails the whole batch.
+    """
+    
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+    
+    def __init__(self, max_batch: int, max_delay_ms: float, ordered: bool = False):
+        self.max_batch = max(max_batch, 1)
+        self.max_delay = max_delay_ms / 1000.0
+        self._pending: List[Tuple[Item, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        # asyncio.Lock wakes waiters in FIFO order, i.e. in flush order
+        self._order_lock = asyncio.Lock() if ordered else None
+        self._draining = False
+    
+    async def submit(self, item: Item) -> Result:
+        """Queue an item for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_batch or self._draining:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        
+        return await future
+    
+    async def drain(self) -> None:
+        """Process anything still buffered and wait for in-flight batches."""
+        self._draining = True
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    @abstractmethod
+    async def process_batch(self, items: List[Item]) -> List[Result]:
+        """Process a batch; returns one result per item, in order."""
+    
+    def _flush(self) -> None:
+        """Hand the buffered items to a processing task and start a new buffer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, pending: List[Tuple[Item, asyncio.Future]]) -> None:
+        """Process a batch (in flush order when ordered) and resolve its futures."""
+        if self._order_lock is None:
+            await self._process(pending)
+            return
+        async with self._order_lock:
+            await self._process(pending)
+    
+    async def _process(self, pending: List[Tuple[Item, asyncio.Future]]) -> None:
+        """Process a batch, falling back to one item per batch on failure."""
+        name = type(self).__name__
+        try:
+            results = await self.process_batch([item for item, _ in pending])
+        except Exception as e:
+            if len(pending) == 1 or not isinstance(e, self.retry_on):
+                logger.error(f"{name} batch of {len(pending)} failed: {e}")
+                _resolve(pending, error=e)
+                return
+            # Isolate the bad item(s) so the rest of the batch still gets results
+            logger.warning(f"{name} batch of {len(pending)} failed ({e}); retrying per item")
+            for entry in pending:
+                try:
+                    _resolve([entry], await self.process_batch([entry[0]]))
+                except Exception as item_error:
+                    _resolve([entry], error=item_error)
+            return
+        
+        logger.debug("%s processed a batch of %d", name, len(pending))
+        _resolve(pending, results)
+
+
+def _resolve(
+    pending: List[Tuple[Any, asyncio.Future]],
+    results: Optional[List[Any]] = None,
+    error: Optional[Exception] = None
+) -> None:
+    """Complete the callers' futures with their results or the batch error."""
+    for i, (_, future) in enumerate(pending):
+        # Callers that were cancelled (client disconnect) no longer want a result
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(results[i])
@@ -5,6 +5,8 @@ Analytical-Intelligence v1 - Configuration
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -25,10 +27,12 @@ def _detect_project_root(start: Path) -> Path:
 PROJECT_ROOT = _detect_project_root(Path(__file__).resolve())
 
 DEFAULT_SSH_MODEL_PATH = str(PROJECT_ROOT / "models/ssh/ssh_lstm.joblib")
+DEFAULT_SSH_ONNX_PATH = str(PROJECT_ROOT / "models/ssh/ssh_lstm.onnx")
 DEFAULT_NETWORK_MODEL_PATH = str(PROJECT_ROOT / "models/network/model.joblib")
 DEFAULT_NETWORK_FEATURES_PATH = str(PROJECT_ROOT / "models/network/feature_list.json")
 DEFAULT_NETWORK_LABELS_PATH = str(PROJECT_ROOT / "models/network/label_map.json")
 DEFAULT_NETWORK_PREPROCESS_PATH = str(PROJECT_ROOT / "models/network/preprocess_config.json")
+DEFAULT_NETWORK_ONNX_PATH = str(PROJECT_ROOT / "models/network/model.onnx")
 
 
 class Settings(BaseSettings):
@@ -53,9 +57,39 @@ class Settings(BaseSettings):
     network_features_path: str = DEFAULT_NETWORK_FEATURES_PATH
     network_labels_path: str = DEFAULT_NETWORK_LABELS_PATH
     network_preprocess_path: str = DEFAULT_NETWORK_PREPROCESS_PATH
+    # Optional ONNX export of the SSH LSTM (scripts/export_ssh_onnx.py)
+    ssh_onnx_path: str = DEFAULT_SSH_ONNX_PATH
+    # ONNX Runtime intra-op threads for the SSH LSTM (0 lets ONNX Runtime use all cores)
+    ssh_onnx_threads: int = 1
+    # Optional ONNX export of the network model (scripts/export_network_onnx.py)
+    network_onnx_path: str = DEFAULT_NETWORK_ONNX_PATH
+    # ONNX Runtime intra-op threads (0 lets ONNX Runtime use all cores)
+    network_onnx_threads: int = 1
 
     # Detection thresholds
     network_ml_threshold: float = 0.60
+    # Per-label overrides, e.g. NETWORK_ML_LABEL_THRESHOLDS='{"PortScan": 0.9}'
+    network_ml_label_thresholds: Dict[str, float] = {}
+    # Detection details carry the top-3 class probabilities unless this is set
+    network_ml_include_all_probs: bool = False
+    # Mapped feature rows memoized by exact flow signature (0 disables)
+    network_feature_cache_size: int = 4096
+    # SSH LSTM scores memoized by exact token window (0 disables)
+    ssh_prediction_cache_size: int = 4096
+
+    # Flow ingestion batching: concurrent flows are classified together in one
+    # model call once the batch fills or the oldest flow has waited max_delay_ms
+    network_batch_size: int = 64
+    network_batch_max_delay_ms: float = 5.0
+    # Auth event batching: token windows from concurrent SSH events are scored
+    # together in one LSTM forward pass, on the same fill-or-timeout rule
+    ssh_batch_size: int = 32
+    ssh_batch_max_delay_ms: float = 20.0
+
+    # Ingest writes: events from concurrent requests are stored together in one
+    # transaction once the batch fills or the oldest has waited max_delay_ms
+    ingest_batch_size: int = 500
+    ingest_batch_max_delay_ms: float = 50.0
 
 
 # Global settings instance
@@ -9,9 +9,37 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import INET, JSONB
 import json
+import math
 
 from app.config import settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _finite_json(value: Any) -> Any:
+    """Replace NaN/Infinity with None and numpy values with Python ones, as orjson does."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_json(item) for item in value]
+    if hasattr(value, "tolist"):
+        # numpy scalars and arrays
+        return _finite_json(value.tolist())
+    return value
+
+
+def dumps_json(value: Any) -> str:
+    """Serialize a payload for a jsonb column (orjson when installed)."""
+    if orjson is not None:
+        # NaN/Infinity become null, which jsonb accepts (json.dumps emits NaN, which it rejects)
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(_finite_json(value), allow_nan=False)
+
 
 # Async engine
 engine = create_async_engine(
@@ -76,12 +104,8 @@ async def get_session() -> AsyncSession:
         yield session
 
 
-async def ensure_device(
-    session: AsyncSession,
-    device_id: str,
-    hostname: str | None = None,
-    ip: str | None = None
-) -> None:
+async def ensure_devices(session: AsyncSession, devices: List[dict]) -> None:
+    """Upsert many devices (dicts of device_id, hostname, ip) in one round-trip."""
     await session.execute(
         text("""
             INSERT INTO devices (device_id, hostname, ip)
@@ -91,66 +115,45 @@ async def ensure_device(
               hostname = COALESCE(EXCLUDED.hostname, devices.hostname),
               ip = COALESCE(EXCLUDED.ip, devices.ip)
         """),
-        {"device_id": device_id, "hostname": hostname, "ip": ip or ""}
+        [
+            {"device_id": d["device_id"], "hostname": d.get("hostname"), "ip": d.get("ip") or ""}
+            for d in devices
+        ]
     )
 
 
-async def insert_raw_event(
-    session: AsyncSession,
-    ts: datetime,
-    device_id: str,
-    event_type: str,
-    payload: dict
-) -> Optional[int]:
-    """Insert a raw event and return its ID."""
+async def reserve_ids(session: AsyncSession, table: str, count: int) -> List[int]:
+    """
+    Draw IDs from a table's id sequence up front, so rows inserted together
+    can reference each other without a RETURNING round-trip per row.
+    """
     result = await session.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+        {"table": table, "count": count}
+    )
+    return [int(row[0]) for row in result.fetchall()]
+
+
+async def insert_raw_events(session: AsyncSession, rows: List[dict]) -> None:
+    """Insert raw events (with reserved IDs, see reserve_ids) in one executemany."""
+    await session.execute(
         text("""
-            INSERT INTO raw_events (ts, device_id, event_type, payload)
-            VALUES (:ts, :device_id, :event_type, :payload::jsonb)
-            RETURNING id
+            INSERT INTO raw_events (id, ts, device_id, event_type, payload)
+            VALUES (:id, :ts, :device_id, :event_type, CAST(:payload AS jsonb))
         """),
-        {
-            "ts": ts,
-            "device_id": device_id,
-            "event_type": event_type,
-            "payload": json.dumps(payload)
-        }
+        [{**row, "payload": dumps_json(row["payload"])} for row in rows]
     )
-    row = result.fetchone()
-    return int(row[0]) if row else None
 
 
-async def insert_detection(
-    session: AsyncSession,
-    ts: datetime,
-    device_id: str,
-    raw_event_id: int,
-    model_name: str,
-    label: str,
-    score: float,
-    severity: str,
-    details: dict
-) -> Optional[int]:
-    """Insert a detection and return its ID."""
-    result = await session.execute(
+async def insert_detections(session: AsyncSession, rows: List[dict]) -> None:
+    """Insert detections (with reserved IDs, see reserve_ids) in one executemany."""
+    await session.execute(
         text("""
-            INSERT INTO detections (ts, device_id, raw_event_id, model_name, label, score, severity, details)
-            VALUES (:ts, :device_id, :raw_event_id, :model_name, :label, :score, :severity, :details::jsonb)
-            RETURNING id
+            INSERT INTO detections (id, ts, device_id, raw_event_id, model_name, label, score, severity, details)
+            VALUES (:id, :ts, :device_id, :raw_event_id, :model_name, :label, :score, :severity, CAST(:details AS jsonb))
         """),
-        {
-            "ts": ts,
-            "device_id": device_id,
-            "raw_event_id": raw_event_id,
-            "model_name": model_name,
-            "label": label,
-            "score": score,
-            "severity": severity,
-            "details": json.dumps(details or {})
-        }
+        [{**row, "details": dumps_json(row["details"] or {})} for row in rows]
     )
-    row = result.fetchone()
-    return int(row[0]) if row else None
 
 
 async def get_stats(session: AsyncSession) -> dict:
@@ -5,23 +5,36 @@ Analytical-Intelligence v1 - Detectors Package
 from app.detectors.severity import (
     get_suricata_severity,
     get_network_ml_severity,
+    get_network_ml_severity_rule,
+    build_network_severity_table,
     get_ssh_severity,
     CRITICAL,
     HIGH,
     MEDIUM,
     LOW,
 )
-from app.detectors.ssh_lstm_detector import analyze_auth_event
-from app.detectors.network_ml_detector import analyze_flow
-from app.detectors.network_feature_mapper import map_flow_to_features
+from app.detectors.ssh_lstm_detector import analyze_auth_event, analyze_auth_events_batch
+from app.detectors.network_ml_detector import analyze_flow, analyze_flows_batch
+from app.detectors.network_feature_mapper import map_flow_to_features, map_flows_to_features
+from app.detectors.flow_batcher import FlowBatcher, flow_batcher
+from app.detectors.ssh_batcher import SSHBatcher, ssh_batcher
 
 __all__ = [
     "get_suricata_severity",
     "get_network_ml_severity", 
+    "get_network_ml_severity_rule",
+    "build_network_severity_table",
     "get_ssh_severity",
     "analyze_auth_event",
+    "analyze_auth_events_batch",
     "analyze_flow",
+    "analyze_flows_batch",
     "map_flow_to_features",
+    "map_flows_to_features",
+    "FlowBatcher",
+    "flow_batcher",
+    "SSHBatcher",
+    "ssh_batcher",
     "CRITICAL",
     "HIGH",
     "MEDIUM",
@@ -0,0 +1,37 @@
+"""
+Analytical-Intelligence v1 - Network Flow Batcher
+Coalesces concurrently ingested flows into batched model calls.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.coalescer import Coalescer
+from app.detectors.network_ml_detector import analyze_flows_batch
+
+
+class FlowBatcher(Coalescer[Dict[str, Any], Optional[Dict[str, Any]]]):
+    """
+    Buffers flows from concurrent requests and classifies them together.
+    
+    Batches are mapped and classified in a worker thread, so the event loop
+    keeps accepting (and buffering) flows while the model runs.
+    
+    analyze_flows_batch already falls back to one flow at a time when a batch
+    fails and never raises, so the coalescer's own per-item retry is off.
+    """
+    
+    retry_on = ()
+    
+    async def analyze(self, flow_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Classify a flow, sharing the model call with other pending flows."""
+        return await self.submit(flow_data)
+    
+    async def process_batch(self, flows: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Map and classify a batch of flows in a worker thread."""
+        return await asyncio.to_thread(analyze_flows_batch, flows)
+
+
+# Global batcher used by flow ingestion
+flow_batcher = FlowBatcher(settings.network_batch_size, settings.network_batch_max_delay_ms)
@@ -3,10 +3,16 @@ Analytical-Intelligence v1 - Network Feature Mapper
 Maps NFStream flow data to CIC-IDS2017 feature format.
 """
 
+from functools import lru_cache
+
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from app.models_loader import FEATURE_DTYPE, network_ml_model
+from app.config import settings
 
-from app.models_loader import network_ml_model
+# Settings are fixed for the process lifetime; read once instead of per flow
+FEATURE_CACHE_SIZE = max(settings.network_feature_cache_size, 0)
 
 
 # NFStream to CIC-IDS feature mapping
@@ -98,23 +104,90 @@ NFSTREAM_TO_CIC_MAP = {
 }
 
 
-def map_flow_to_features(flow_data: Dict[str, Any]) -> np.ndarray:
+# Every NFStream field the mapper reads; together they fully determine the feature row
+SIGNATURE_FIELDS = tuple(sorted(
+    {field for field in NFSTREAM_TO_CIC_MAP.values() if field}
+    | {
+        "bidirectional_duration_ms", "bidirectional_bytes", "bidirectional_packets",
+        "src2dst_packets", "dst2src_packets", "src2dst_mean_ps", "dst2src_mean_ps",
+        "bidirectional_stddev_ps",
+    }
+))
+
+# Marks a field absent from the flow (distinct from a field present with None)
+_MISSING = object()
+
+
+def map_flow_to_features(flow_data: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Map NFStream flow data to CIC-IDS feature vector.
     
+    Repeated flows with an identical signature (typical of scans and floods)
+    are served from a bounded LRU cache instead of being re-mapped.
+    
     Args:
         flow_data: Dictionary of flow statistics from NFStream
+        out: Optional (1, 70) FEATURE_DTYPE buffer to write the row into, so a
+            caller can reuse one row across flows instead of allocating
     
     Returns:
-        numpy array of shape (70,) matching feature_list order
+        C-contiguous FEATURE_DTYPE (float64) array of shape (1, 70) matching feature_list order,
+        ready to be passed straight to the model without reshape/copy
+        (out itself when given)
     """
     if not network_ml_model.loaded:
-        return np.array([])
+        return np.empty((1, 0), dtype=FEATURE_DTYPE)
     
+    if FEATURE_CACHE_SIZE:
+        signature = tuple(flow_data.get(field, _MISSING) for field in SIGNATURE_FIELDS)
+        try:
+            cached = _map_signature(signature)
+        except TypeError:
+            # Unhashable field value - map without the cache
+            return _map_flow(flow_data, out)
+        
+        # Copy: callers preprocess the returned row in place
+        if out is None:
+            return cached.copy()
+        np.copyto(out, cached)
+        return out
+    
+    return _map_flow(flow_data, out)
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _map_signature(signature: tuple) -> np.ndarray:
+    """Map a flow rebuilt from its signature (memoized)."""
+    flow_data = {
+        field: value
+        for field, value in zip(SIGNATURE_FIELDS, signature)
+        if value is not _MISSING
+    }
+    return _map_flow(flow_data)
+
+
+# Cached rows are only valid for the feature list they were built against
+network_ml_model.add_load_listener(_map_signature.cache_clear)
+
+
+def _map_flow(flow_data: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Build the (1, F) feature row for a single flow, into out when given."""
     feature_list = network_ml_model.feature_list
-    median_map = network_ml_model.median_map
+    nan = np.nan
+    
+    features = np.empty((1, len(feature_list)), dtype=FEATURE_DTYPE) if out is None else out
+    row = features[0]
+    
+    # Counters used in derived features; absent, None and NaN count as 0,
+    # as in map_columns_to_features
+    duration_ms = _counter(flow_data, "bidirectional_duration_ms")
+    total_bytes = _counter(flow_data, "bidirectional_bytes")
+    total_packets = _counter(flow_data, "bidirectional_packets")
+    fwd_packets = _counter(flow_data, "src2dst_packets")
+    bwd_packets = _counter(flow_data, "dst2src_packets")
     
-    features = np.zeros(len(feature_list), dtype=np.float64)
+    # Per-second rates share one reciprocal of the duration (same as map_columns_to_features)
+    per_second = 1000 / duration_ms if duration_ms > 0 else None
     
     for i, feature_name in enumerate(feature_list):
         # Try to map from NFStream data
@@ -131,40 +204,28 @@ def map_flow_to_features(flow_data: Dict[str, Any]) -> np.ndarray:
         # Compute derived features
         if value is None:
             if feature_name == "FlowBytes/s":
-                duration_ms = flow_data.get("bidirectional_duration_ms", 0)
-                total_bytes = flow_data.get("bidirectional_bytes", 0)
-                if duration_ms > 0:
-                    value = (total_bytes / duration_ms) * 1000  # bytes per second
+                if per_second is not None:
+                    value = total_bytes * per_second  # bytes per second
                     
             elif feature_name == "FlowPackets/s":
-                duration_ms = flow_data.get("bidirectional_duration_ms", 0)
-                total_packets = flow_data.get("bidirectional_packets", 0)
-                if duration_ms > 0:
-                    value = (total_packets / duration_ms) * 1000  # packets per second
+                if per_second is not None:
+                    value = total_packets * per_second  # packets per second
                     
             elif feature_name == "FwdPackets/s":
-                duration_ms = flow_data.get("bidirectional_duration_ms", 0)
-                fwd_packets = flow_data.get("src2dst_packets", 0)
-                if duration_ms > 0:
-                    value = (fwd_packets / duration_ms) * 1000
+                if per_second is not None:
+                    value = fwd_packets * per_second
                     
             elif feature_name == "BwdPackets/s":
-                duration_ms = flow_data.get("bidirectional_duration_ms", 0)
-                bwd_packets = flow_data.get("dst2src_packets", 0)
-                if duration_ms > 0:
-                    value = (bwd_packets / duration_ms) * 1000
+                if per_second is not None:
+                    value = bwd_packets * per_second
                     
             elif feature_name == "Down/UpRatio":
-                fwd_packets = flow_data.get("src2dst_packets", 0)
-                bwd_packets = flow_data.get("dst2src_packets", 0)
                 if fwd_packets > 0:
                     value = bwd_packets / fwd_packets
                 else:
                     value = 0
                     
             elif feature_name == "AveragePacketSize":
-                total_bytes = flow_data.get("bidirectional_bytes", 0)
-                total_packets = flow_data.get("bidirectional_packets", 0)
                 if total_packets > 0:
                     value = total_bytes / total_packets
                     
@@ -179,15 +240,97 @@ def map_flow_to_features(flow_data: Dict[str, Any]) -> np.ndarray:
                 if std is not None:
                     value = std ** 2
         
-        # Use median as fallback
-        if value is None:
-            value = median_map.get(feature_name, 0.0)
+        row[i] = nan if value is None else value
+    
+    # Missing and NaN/Inf values fall back to the median in one vectorized pass
+    bad = ~np.isfinite(row)
+    if bad.any():
+        np.copyto(row, network_ml_model.median_vector, where=bad)
+    
+    return features
+
+
+def _counter(flow_data: Dict[str, Any], field: str) -> Any:
+    """A flow counter, with absent, None and NaN values read as 0."""
+    value = flow_data.get(field)
+    return 0 if value is None or value != value else value
+
+
+def flows_to_columns(flows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Transpose a list of flow dicts into one float64 column per NFStream field.
+    Missing and None values become NaN.
+    """
+    nan = np.nan
+    count = len(flows)
+    return {
+        field: np.fromiter(
+            (nan if value is None else value for value in (flow.get(field) for flow in flows)),
+            dtype=np.float64,
+            count=count,
+        )
+        for field in SIGNATURE_FIELDS
+    }
+
+
+def map_flows_to_features(flows: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Map a batch of NFStream flows to a CIC-IDS feature matrix.
+    
+    Returns:
+        C-contiguous FEATURE_DTYPE (float64) array of shape (N, 70)
+    """
+    if not network_ml_model.loaded:
+        return np.empty((len(flows), 0), dtype=FEATURE_DTYPE)
+    
+    return map_columns_to_features(flows_to_columns(flows))
+
+
+def map_columns_to_features(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Vectorized equivalent of map_flow_to_features over columnar flow data
+    (as produced by flows_to_columns).
+    """
+    feature_list = network_ml_model.feature_list
+    count = len(columns["bidirectional_duration_ms"])
+    
+    # Counters used in derived features default to 0 when absent
+    duration_ms = np.nan_to_num(columns["bidirectional_duration_ms"], nan=0.0)
+    total_bytes = np.nan_to_num(columns["bidirectional_bytes"], nan=0.0)
+    total_packets = np.nan_to_num(columns["bidirectional_packets"], nan=0.0)
+    fwd_packets = np.nan_to_num(columns["src2dst_packets"], nan=0.0)
+    bwd_packets = np.nan_to_num(columns["dst2src_packets"], nan=0.0)
+    
+    # NaN marks "not computable"; it falls back to the median at the end
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_second = np.where(duration_ms > 0, 1000.0 / duration_ms, np.nan)
+        derived = {
+            "FlowBytes/s": total_bytes * per_second,
+            "FlowPackets/s": total_packets * per_second,
+            "FwdPackets/s": fwd_packets * per_second,
+            "BwdPackets/s": bwd_packets * per_second,
+            "Down/UpRatio": np.where(fwd_packets > 0, bwd_packets / fwd_packets, 0.0),
+            "AveragePacketSize": np.where(total_packets > 0, total_bytes / total_packets, np.nan),
+            "AvgFwdSegmentSize": columns["src2dst_mean_ps"],
+            "AvgBwdSegmentSize": columns["dst2src_mean_ps"],
+            "PacketLengthVariance": columns["bidirectional_stddev_ps"] ** 2,
+        }
+    
+    features = np.empty((count, len(feature_list)), dtype=FEATURE_DTYPE)
+    
+    for i, feature_name in enumerate(feature_list):
+        nfstream_field = NFSTREAM_TO_CIC_MAP.get(feature_name)
         
-        # Handle NaN/Inf
-        if not np.isfinite(value):
-            value = median_map.get(feature_name, 0.0)
+        if nfstream_field:
+            column = columns[nfstream_field]
+            if feature_name == "FlowDuration":
+                column = column * 1000  # Convert ms to microseconds
+        else:
+            column = derived.get(feature_name, np.nan)
         
-        features[i] = value
+        features[:, i] = column
+    
+    np.copyto(features, network_ml_model.median_vector, where=~np.isfinite(features))
     
     return features
 
@@ -195,26 +338,19 @@ def map_flow_to_features(flow_data: Dict[str, Any]) -> np.ndarray:
 def preprocess_features(features: np.ndarray) -> np.ndarray:
     """
     Apply preprocessing: fill NaN with median, clip extreme values.
+    Operates in place on the (N, F) matrix returned by the mappers.
     """
     if not network_ml_model.loaded:
         return features
     
-    feature_list = network_ml_model.feature_list
-    median_map = network_ml_model.median_map
-    columns_to_clip = network_ml_model.columns_to_clip
-    
     # Replace NaN/Inf with median
-    for i, feature_name in enumerate(feature_list):
-        if not np.isfinite(features[i]):
-            features[i] = median_map.get(feature_name, 0.0)
+    bad = ~np.isfinite(features)
+    if bad.any():
+        np.copyto(features, network_ml_model.median_vector, where=bad)
     
     # Clip extreme values for specified columns
     # Use 1st and 99th percentile-like thresholds (approximated)
-    for i, feature_name in enumerate(feature_list):
-        if feature_name in columns_to_clip:
-            median_val = median_map.get(feature_name, 0.0)
-            # Clip to 10x median as a safe upper bound
-            max_val = max(median_val * 10, 1e6)
-            features[i] = np.clip(features[i], 0, max_val)
+    clip_indices = network_ml_model.clip_indices
+    features[:, clip_indices] = np.clip(features[:, clip_indices], 0, network_ml_model.clip_max)
     
     return features
@@ -4,17 +4,80 @@ Classifies network flows using the trained ML model.
 """
 
 import logging
-from typing import Dict, Any, Optional, Tuple
+import threading
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 import numpy as np
 
-from app.models_loader import network_ml_model
-from app.detectors.network_feature_mapper import map_flow_to_features, preprocess_features
-from app.detectors.severity import get_network_ml_severity
+from app.models_loader import FEATURE_DTYPE, network_ml_model
+from app.detectors.network_feature_mapper import (
+    map_flow_to_features,
+    map_flows_to_features,
+    preprocess_features,
+)
+from app.detectors.severity import build_network_severity_table
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Normalized labels that never produce a detection
+REJECTED_LABELS = frozenset(("BENIGN", "UNKNOWN", ""))
+
+# Flow fields copied into detection details, in unpack order
+DETAIL_FLOW_FIELDS = (
+    "src_ip",
+    "dst_ip",
+    "src_port",
+    "dst_port",
+    "protocol",
+    "bidirectional_duration_ms",
+    "bidirectional_bytes",
+    "bidirectional_packets",
+)
+
+# Number of class probabilities kept in detection details
+TOP_PROBS = 3
+INCLUDE_ALL_PROBS = settings.network_ml_include_all_probs
+
+# Per class column: (detectable, threshold, severity rule). Rebuilt whenever the model loads.
+_class_gates: Tuple[Tuple[bool, float, Callable[[float], str]], ...] = ()
+_detectable_mask = np.zeros(0, dtype=bool)
+
+
+def _refresh_class_gates() -> None:
+    """Fold label rejection, per-label thresholds and severity rules into one record per class."""
+    global _class_gates, _detectable_mask
+    
+    detectable = [
+        network_ml_model.normalized_labels.get(label, "UNKNOWN") not in REJECTED_LABELS
+        and label in network_ml_model.known_labels
+        for label in network_ml_model.class_labels
+    ]
+    severity_rules = build_network_severity_table(network_ml_model.class_labels)
+    _class_gates = tuple(zip(
+        detectable,
+        network_ml_model.threshold_by_id.tolist(),
+        [severity_rules[label] for label in network_ml_model.class_labels],
+    ))
+    _detectable_mask = np.array(detectable, dtype=bool)
+
+
+network_ml_model.add_load_listener(_refresh_class_gates)
+if network_ml_model.loaded:
+    _refresh_class_gates()
+
+# Per-thread scratch row for analyze_flow; the model never keeps a reference to its input
+_row_buffers = threading.local()
+
+
+def _row_buffer() -> np.ndarray:
+    """Return this thread's (1, n_features) FEATURE_DTYPE scratch row."""
+    row = getattr(_row_buffers, "row", None)
+    if row is None or row.shape[1] != network_ml_model.n_features:
+        row = np.empty((1, network_ml_model.n_features), dtype=FEATURE_DTYPE)
+        _row_buffers.row = row
+    return row
+
 
 def analyze_flow(flow_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
@@ -31,60 +94,34 @@ def analyze_flow(flow_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
     
     try:
-        # Map flow to feature vector
-        features = map_flow_to_features(flow_data)
+        # Map flow to feature vector (written into the reused scratch row)
+        features = map_flow_to_features(flow_data, out=_row_buffer())
         
-        if len(features) == 0:
+        if features.size == 0:
             return None
         
         # Preprocess
         features = preprocess_features(features)
         
         # Predict
-        label, score, proba = network_ml_model.predict(features)
-
-        label_norm = (label or "").strip().upper()
+        label_id, score, proba = network_ml_model.predict(features)
 
-        # Reject benign/unknown/empty
-        if label_norm in ("BENIGN", "UNKNOWN", ""):
+        # Failed predictions and columns outside the label map have no gate
+        if not 0 <= label_id < len(_class_gates):
             return None
 
-        # Reject labels not in known label map (when model loaded)
-        known = set(network_ml_model.label_map.keys()) if network_ml_model.loaded else set()
-        if known and label not in known:
+        # Reject benign/unknown/empty and labels not in known label map
+        detectable, threshold, severity_rule = _class_gates[label_id]
+        if not detectable:
             return None
 
-        logger.debug(f"Flow prediction: {label} (score={score:.3f})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Flow prediction: %s (score=%.3f)", network_ml_model.decode_label(label_id), score)
 
         # Only create detection for non-benign with sufficient confidence
-        if label_norm != "BENIGN" and score >= settings.network_ml_threshold:
-            severity = get_network_ml_severity(label, score)
-            
-            # Build detection details
-            details = {
-                "label": label,
-                "confidence": round(score, 4),
-                "src_ip": flow_data.get("src_ip"),
-                "dst_ip": flow_data.get("dst_ip"),
-                "src_port": flow_data.get("src_port"),
-                "dst_port": flow_data.get("dst_port"),
-                "protocol": flow_data.get("protocol"),
-                "duration_ms": flow_data.get("bidirectional_duration_ms"),
-                "total_bytes": flow_data.get("bidirectional_bytes"),
-                "total_packets": flow_data.get("bidirectional_packets"),
-                "probabilities": {
-                    network_ml_model.inverse_label_map.get(i, str(i)): round(float(p), 4)
-                    for i, p in enumerate(proba)
-                } if len(proba) > 0 else {}
-            }
-            
-            return {
-                "model_name": "network_ml",
-                "label": label,
-                "score": score,
-                "severity": severity,
-                "details": details
-            }
+        if score >= threshold:
+            label = network_ml_model.class_labels[label_id]
+            return _build_detection(flow_data, label, score, severity_rule(score), proba)
         
         return None
         
@@ -93,6 +130,102 @@ def analyze_flow(flow_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
 
+def analyze_flows_batch(flows: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Analyze many network flows with a single model call.
+    
+    Args:
+        flows: Flow statistics from NFStream
+    
+    Returns:
+        One entry per flow: detection dict if attack detected, None otherwise
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(flows)
+    if not flows or not network_ml_model.loaded:
+        return results
+    
+    try:
+        features = preprocess_features(map_flows_to_features(flows))
+        if features.size == 0:
+            return results
+        
+        label_ids, scores, proba = network_ml_model.predict_many(features)
+        
+        # Same gates as analyze_flow, evaluated as masks over the whole batch
+        class_labels = network_ml_model.class_labels
+        valid = (label_ids >= 0) & (label_ids < len(_detectable_mask))
+        accepted = valid.copy()
+        accepted[valid] = (
+            _detectable_mask[label_ids[valid]]
+            & (scores[valid] >= network_ml_model.threshold_by_id[label_ids[valid]])
+        )
+        
+        # Only accepted rows need a label; pull them out as Python scalars in one go
+        rows = np.flatnonzero(accepted)
+        for i, label_id, score in zip(rows.tolist(), label_ids[rows].tolist(), scores[rows].tolist()):
+            results[i] = _build_detection(
+                flows[i], class_labels[label_id], score, _class_gates[label_id][2](score), proba[i]
+            )
+        
+    except Exception as e:
+        # One malformed flow must not cost the rest of the batch its detections
+        logger.error(f"Batch flow analysis error, analyzing flows individually: {e}")
+        return [analyze_flow(flow_data) for flow_data in flows]
+    
+    return results
+
+
+def _build_detection(
+    flow_data: Dict[str, Any],
+    label: str,
+    score: float,
+    severity: str,
+    proba: np.ndarray
+) -> Dict[str, Any]:
+    """Build the detection dict for an accepted prediction."""
+    (
+        src_ip, dst_ip, src_port, dst_port, protocol,
+        duration_ms, total_bytes, total_packets,
+    ) = map(flow_data.get, DETAIL_FLOW_FIELDS)
+    
+    # Build detection details
+    details = {
+        "label": label,
+        "confidence": round(score, 4),
+        "src_ip": src_ip,
+        "dst_ip": dst_ip,
+        "src_port": src_port,
+        "dst_port": dst_port,
+        "protocol": protocol,
+        "duration_ms": duration_ms,
+        "total_bytes": total_bytes,
+        "total_packets": total_packets,
+        "probabilities": _top_probabilities(proba)
+    }
+    
+    return {
+        "model_name": "network_ml",
+        "label": label,
+        "score": score,
+        "severity": severity,
+        "details": details
+    }
+
+
+def _top_probabilities(proba: np.ndarray) -> Dict[str, float]:
+    """Rounded class probabilities for detection details, highest first."""
+    proba = np.round(np.asarray(proba, dtype=np.float64), 4)
+    labels = network_ml_model.class_labels
+    
+    if INCLUDE_ALL_PROBS or len(proba) <= TOP_PROBS:
+        return dict(zip(labels, proba.tolist()))
+    
+    # argpartition is O(C); only the selected few get sorted
+    top = np.argpartition(proba, -TOP_PROBS)[-TOP_PROBS:]
+    top = top[np.argsort(proba[top])[::-1]]
+    return {labels[i]: p for i, p in zip(top.tolist(), proba[top].tolist())}
+
+
 def get_model_info() -> Dict[str, Any]:
     """Get network ML model information."""
     return {
@@ -100,4 +233,5 @@ def get_model_info() -> Dict[str, Any]:
         "features_count": len(network_ml_model.feature_list),
         "labels": list(network_ml_model.label_map.keys()),
         "threshold": settings.network_ml_threshold,
+        "label_thresholds": settings.network_ml_label_thresholds,
     }
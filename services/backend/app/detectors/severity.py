@@ -2,7 +2,8 @@
 Analytical-Intelligence v1 - Severity Classification
 """
 
-from typing import Optional
+import re
+from typing import Callable, Dict, Iterable, Optional
 
 
 # Severity levels
@@ -11,6 +12,20 @@ HIGH = "HIGH"
 MEDIUM = "MEDIUM"
 LOW = "LOW"
 
+# Suricata signature/category keywords, each list compiled into one alternation
+SURICATA_CRITICAL_PATTERNS = [
+    "ddos", "dos ", "flood", "amplification",
+    "denial of service", "resource exhaustion"
+]
+SURICATA_HIGH_PATTERNS = [
+    "scan", "brute", "exploit", "attack",
+    "shellcode", "trojan", "malware", "backdoor",
+    "command injection", "sql injection", "xss",
+    "remote code execution", "rce", "buffer overflow"
+]
+_SURICATA_CRITICAL_RE = re.compile("|".join(map(re.escape, SURICATA_CRITICAL_PATTERNS)))
+_SURICATA_HIGH_RE = re.compile("|".join(map(re.escape, SURICATA_HIGH_PATTERNS)))
+
 
 def get_suricata_severity(signature: str, category: str = None, suricata_severity: int = None) -> str:
     """
@@ -28,24 +43,12 @@ def get_suricata_severity(signature: str, category: str = None, suricata_severit
     cat_lower = category.lower() if category else ""
     
     # CRITICAL: DoS, DDoS, flood attacks
-    critical_patterns = [
-        "ddos", "dos ", "flood", "amplification",
-        "denial of service", "resource exhaustion"
-    ]
-    for pattern in critical_patterns:
-        if pattern in sig_lower or pattern in cat_lower:
-            return CRITICAL
+    if _SURICATA_CRITICAL_RE.search(sig_lower) or _SURICATA_CRITICAL_RE.search(cat_lower):
+        return CRITICAL
     
     # HIGH: Scans, brute force, exploitation attempts
-    high_patterns = [
-        "scan", "brute", "exploit", "attack",
-        "shellcode", "trojan", "malware", "backdoor",
-        "command injection", "sql injection", "xss",
-        "remote code execution", "rce", "buffer overflow"
-    ]
-    for pattern in high_patterns:
-        if pattern in sig_lower or pattern in cat_lower:
-            return HIGH
+    if _SURICATA_HIGH_RE.search(sig_lower) or _SURICATA_HIGH_RE.search(cat_lower):
+        return HIGH
     
     # Use Suricata's own severity as fallback
     if suricata_severity is not None:
@@ -71,31 +74,49 @@ def get_network_ml_severity(label: str, score: float) -> str:
     Returns:
         Severity string
     """
+    return get_network_ml_severity_rule(label)(score)
+
+
+def get_network_ml_severity_rule(label: str) -> Callable[[float], str]:
+    """
+    Resolve the severity rule for a network ML label once.
+    
+    The model emits a fixed label set, so the label matching below can run at
+    model load; the returned callable only looks at the confidence score.
+    
+    Args:
+        label: Attack label
+    
+    Returns:
+        Callable mapping a confidence score (0-1) to a severity string
+    """
     label_lower = label.lower() if label else ""
     
     # CRITICAL: DDoS attacks
     if "ddos" in label_lower:
-        return CRITICAL
+        return lambda score: CRITICAL
     
     # HIGH: DoS attacks
     if "dos" in label_lower:
-        if score >= 0.90:
-            return CRITICAL
-        return HIGH
+        return lambda score: CRITICAL if score >= 0.90 else HIGH
     
     # HIGH: Brute force attacks
     if "patator" in label_lower or "brute" in label_lower:
-        return HIGH
+        return lambda score: HIGH
     
     # MEDIUM: Port scans
     if "scan" in label_lower or "portscan" in label_lower:
-        return MEDIUM
+        return lambda score: MEDIUM
     
     # MEDIUM: Bot traffic
     if "bot" in label_lower:
-        return MEDIUM
+        return lambda score: MEDIUM
     
-    # Default based on score
+    return _score_severity
+
+
+def _score_severity(score: float) -> str:
+    """Default based on score."""
     if score >= 0.95:
         return HIGH
     elif score >= 0.80:
@@ -104,6 +125,11 @@ def get_network_ml_severity(label: str, score: float) -> str:
         return LOW
 
 
+def build_network_severity_table(labels: Iterable[str]) -> Dict[str, Callable[[float], str]]:
+    """Map each network ML label to its severity rule."""
+    return {label: get_network_ml_severity_rule(label) for label in labels}
+
+
 def get_ssh_severity(failed_count: int, is_model_anomaly: bool, score: float = 0.0) -> str:
     """
     Determine severity for SSH LSTM detections.
@@ -0,0 +1,47 @@
+"""
+Analytical-Intelligence v1 - SSH Event Batcher
+Coalesces concurrently ingested auth events into batched LSTM calls.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.coalescer import Coalescer
+from app.detectors.ssh_lstm_detector import analyze_auth_events_batch
+
+logger = logging.getLogger(__name__)
+
+
+class SSHBatcher(Coalescer[Tuple[str, datetime], Optional[Dict[str, Any]]]):
+    """
+    Buffers auth events from concurrent requests and scores them together.
+    
+    Events update per-IP tracker state, so batches run one at a time in
+    arrival order. A failed batch is not retried per event (its events may
+    already be tracked); its events get no detection, as analyze_auth_event
+    errors did before batching, and are still stored by their requests.
+    Within a batch every uncached token window goes through the LSTM in one
+    forward pass.
+    """
+    
+    def __init__(self, max_batch: int, max_delay_ms: float):
+        super().__init__(max_batch, max_delay_ms, ordered=True)
+    
+    async def analyze(self, line: str, timestamp: datetime) -> Optional[Dict[str, Any]]:
+        """Analyze an auth.log line, sharing the model call with other pending events."""
+        return await self.submit((line, timestamp))
+    
+    async def process_batch(self, events: List[Tuple[str, datetime]]) -> List[Optional[Dict[str, Any]]]:
+        """Track and score a batch of auth events in a worker thread."""
+        try:
+            return await asyncio.to_thread(analyze_auth_events_batch, events)
+        except Exception as e:
+            logger.error(f"SSH batch analysis error: {e}")
+            return [None] * len(events)
+
+
+# Global batcher used by auth ingestion
+ssh_batcher = SSHBatcher(settings.ssh_batch_size, settings.ssh_batch_max_delay_ms)
@@ -5,93 +5,260 @@ Detects SSH brute force and anomalous authentication patterns.
 
 import re
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple, List
-from collections import defaultdict
+import threading
+from bisect import bisect_right, insort
+from operator import itemgetter
+from datetime import datetime, timezone
+from typing import Deque, Dict, Any, Optional, Tuple, List
+from collections import OrderedDict, deque
 
 import numpy as np
 
 from app.models_loader import ssh_lstm_model
 from app.detectors.severity import get_ssh_severity
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-# Token definitions for auth.log parsing
+# Token definitions for auth.log parsing (compiled once; first match wins)
 TOKEN_PATTERNS = [
-    (r"Failed password for invalid user", "INVALID_USER"),
-    (r"Failed password for", "FAILED_PASSWORD"),
-    (r"Invalid user", "INVALID_USER"),
-    (r"Accepted password for", "ACCEPTED_PASSWORD"),
-    (r"Accepted publickey for", "ACCEPTED_PUBLICKEY"),
-    (r"Disconnected from", "DISCONNECT"),
-    (r"Connection closed by", "CONNECTION_CLOSED"),
-    (r"POSSIBLE BREAK-IN ATTEMPT", "REVERSE_DNS_FAIL"),
-    (r"Reverse mapping checking", "REVERSE_DNS_FAIL"),
-    (r"pam_unix.*authentication failure", "PAM_AUTH_FAILURE"),
-    (r"session opened for user", "SESSION_OPENED"),
-    (r"session closed for user", "SESSION_CLOSED"),
+    (re.compile(pattern, re.IGNORECASE), token)
+    for pattern, token in [
+        (r"Failed password for invalid user", "INVALID_USER"),
+        (r"Failed password for", "FAILED_PASSWORD"),
+        (r"Invalid user", "INVALID_USER"),
+        (r"Accepted password for", "ACCEPTED_PASSWORD"),
+        (r"Accepted publickey for", "ACCEPTED_PUBLICKEY"),
+        (r"Disconnected from", "DISCONNECT"),
+        (r"Connection closed by", "CONNECTION_CLOSED"),
+        (r"POSSIBLE BREAK-IN ATTEMPT", "REVERSE_DNS_FAIL"),
+        (r"Reverse mapping checking", "REVERSE_DNS_FAIL"),
+        (r"pam_unix.*authentication failure", "PAM_AUTH_FAILURE"),
+        (r"session opened for user", "SESSION_OPENED"),
+        (r"session closed for user", "SESSION_CLOSED"),
+    ]
 ]
 
 # IP extraction patterns
 IP_PATTERNS = [
-    r"from\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})",
-    r"rhost=(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})",
-    r"\[(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\]",
+    re.compile(r"from\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"),
+    re.compile(r"rhost=(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"),
+    re.compile(r"\[(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\]"),
 ]
 
+# Token patterns without regex syntax are plain case-insensitive substrings.
+# On ASCII lines (where lower() and IGNORECASE agree) they are tested with a
+# substring check on the lowercased line instead of a regex search each.
+_REGEX_SYNTAX = re.compile(r"[.^$*+?{}\[\]\\|()]")
+TOKEN_MATCHERS = [
+    (None if _REGEX_SYNTAX.search(pattern.pattern) else pattern.pattern.lower(), pattern, token)
+    for pattern, token in TOKEN_PATTERNS
+]
+
+
+# Tokens counted as failed login attempts
+FAILED_TOKENS = frozenset({"FAILED_PASSWORD", "INVALID_USER", "PAM_AUTH_FAILURE"})
+
+
+# How long per-IP history is kept, in seconds
+HISTORY_SEC = 3600.0
+# Events per tracker between sweeps that drop IPs idle for HISTORY_SEC
+EVICT_EVERY = 4096
+
+
+def to_epoch_seconds(timestamp: datetime) -> float:
+    """Epoch seconds for a timestamp; naive datetimes are UTC (as from utcnow)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class IPState:
+    """
+    History for one source IP, sorted by timestamp: (timestamp, token_id) events
+    and failed attempt timestamps. Sensors with skewed clocks or replayed
+    backlogs can deliver events out of order, so late ones are inserted in
+    place rather than appended. The failed-attempt deque is only created on
+    the first failure, as most IPs never fail.
+    """
+    
+    __slots__ = ("tokens", "failed")
+    
+    def __init__(self):
+        self.tokens: Deque[Tuple[float, int]] = deque()
+        self.failed: Optional[Deque[float]] = None
+
 
 class SSHEventTracker:
-    """Tracks SSH events per source IP for anomaly detection."""
+    """
+    Tracks SSH events per source IP for anomaly detection.
+    Timestamps are epoch seconds (see to_epoch_seconds).
+    """
     
     def __init__(self):
-        # Per-IP rolling token sequences
-        self.ip_tokens: Dict[str, List[Tuple[datetime, int]]] = defaultdict(list)
-        # Per-IP failed attempt counts
-        self.ip_failed_counts: Dict[str, List[datetime]] = defaultdict(list)
+        self.ips: Dict[str, IPState] = {}
+        self._events_since_evict = 0
     
-    def add_event(self, src_ip: str, token_id: int, timestamp: datetime):
+    def _state(self, src_ip: str) -> IPState:
+        """Get or create the state for an IP."""
+        state = self.ips.get(src_ip)
+        if state is None:
+            state = self.ips[src_ip] = IPState()
+        return state
+    
+    def add_event(self, src_ip: str, token_id: int, timestamp: float):
         """Add an event to the tracker."""
-        self.ip_tokens[src_ip].append((timestamp, token_id))
+        tokens = self._state(src_ip).tokens
+        if not tokens or timestamp >= tokens[-1][0]:
+            tokens.append((timestamp, token_id))
+        else:
+            # Late event: insert after any events with the same timestamp
+            insort(tokens, (timestamp, token_id), key=itemgetter(0))
+        
+        # Keep only recent events (last hour); the deque is time-sorted, so
+        # stale ones are at the front
+        cutoff = timestamp - HISTORY_SEC
+        while tokens[0][0] <= cutoff:
+            tokens.popleft()
         
-        # Keep only recent events (last hour)
-        cutoff = timestamp - timedelta(hours=1)
-        self.ip_tokens[src_ip] = [
-            (ts, tid) for ts, tid in self.ip_tokens[src_ip]
-            if ts > cutoff
+        self._events_since_evict += 1
+        if self._events_since_evict >= EVICT_EVERY:
+            self._evict_idle(cutoff)
+    
+    def _evict_idle(self, cutoff: float):
+        """
+        Forget IPs with no event or failure after cutoff. Their history would
+        be pruned on their next event anyway; without this, IPs seen once
+        stay in memory forever. Both deques are time-sorted, so their last
+        entry is the IP's newest.
+        """
+        self._events_since_evict = 0
+        idle = [
+            ip for ip, state in self.ips.items()
+            if (not state.tokens or state.tokens[-1][0] <= cutoff)
+            and (not state.failed or state.failed[-1] <= cutoff)
         ]
+        for ip in idle:
+            del self.ips[ip]
     
-    def add_failed_attempt(self, src_ip: str, timestamp: datetime):
+    def add_failed_attempt(self, src_ip: str, timestamp: float):
         """Record a failed authentication attempt."""
-        self.ip_failed_counts[src_ip].append(timestamp)
+        state = self._state(src_ip)
+        attempts = state.failed
+        if attempts is None:
+            attempts = state.failed = deque()
+        if not attempts or timestamp >= attempts[-1]:
+            attempts.append(timestamp)
+        else:
+            insort(attempts, timestamp)
         
         # Keep only recent attempts
-        cutoff = timestamp - timedelta(hours=1)
-        self.ip_failed_counts[src_ip] = [
-            ts for ts in self.ip_failed_counts[src_ip]
-            if ts > cutoff
-        ]
+        cutoff = timestamp - HISTORY_SEC
+        while attempts[0] <= cutoff:
+            attempts.popleft()
     
-    def get_failed_count_in_window(self, src_ip: str, timestamp: datetime, window_sec: int) -> int:
-        """Get count of failed attempts in the time window."""
-        cutoff = timestamp - timedelta(seconds=window_sec)
-        return len([ts for ts in self.ip_failed_counts.get(src_ip, []) if ts > cutoff])
+    def get_failed_count_in_window(self, src_ip: str, timestamp: float, window_sec: int) -> int:
+        """Get count of failed attempts in the window (timestamp - window_sec, timestamp]."""
+        state = self.ips.get(src_ip)
+        if state is None or not state.failed:
+            return 0
+        
+        # Attempts are time-sorted; attempts later than timestamp (from a
+        # sensor ahead of this one) are outside the window
+        attempts = state.failed
+        cutoff = timestamp - window_sec
+        return bisect_right(attempts, timestamp) - bisect_right(attempts, cutoff)
     
     def get_token_sequence(self, src_ip: str, window_size: int) -> np.ndarray:
         """Get the latest token sequence for an IP."""
-        tokens = self.ip_tokens.get(src_ip, [])
-        if not tokens:
+        state = self.ips.get(src_ip)
+        if state is None or not state.tokens:
             return np.array([], dtype=np.int32)
         
-        # Extract just the token IDs, sorted by time
-        sorted_tokens = sorted(tokens, key=lambda x: x[0])
-        token_ids = [tid for _, tid in sorted_tokens[-window_size:]]
-        
-        return np.array(token_ids, dtype=np.int32)
+        # Tokens are kept time-sorted; take the IDs of the newest window_size
+        tokens = state.tokens
+        count = min(len(tokens), window_size)
+        return np.fromiter(
+            (tokens[i][1] for i in range(-count, 0)),
+            dtype=np.int32,
+            count=count
+        )
+
+
+class ShardedSSHTracker:
+    """
+    SSHEventTracker split into independently locked shards by source IP.
+    
+    All state for one IP lives in one shard, so events from different IPs
+    analyzed in parallel threads rarely contend for the same lock.
+    """
+    
+    def __init__(self, shards: int = 16):
+        self.shards = [SSHEventTracker() for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+    
+    def shard_for(self, src_ip: str) -> Tuple[SSHEventTracker, threading.Lock]:
+        """Return the tracker holding src_ip's state and the lock guarding it."""
+        index = hash(src_ip) % len(self.shards)
+        return self.shards[index], self.locks[index]
 
 
 # Global tracker instance
-ssh_tracker = SSHEventTracker()
+ssh_tracker = ShardedSSHTracker()
+
+
+class ScoreCache:
+    """
+    LRU of LSTM (score, is_anomaly) results keyed by token window bytes.
+    Brute-force bursts repeat the same window, so most lookups skip the model.
+    Unlike lru_cache it can be probed and filled separately, which the batch
+    path needs to send only the missing windows through one model call.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._scores: "OrderedDict[bytes, Tuple[float, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: bytes) -> Optional[Tuple[float, bool]]:
+        """Return the cached result for key, or None."""
+        with self._lock:
+            result = self._scores.get(key)
+            if result is not None:
+                self._scores.move_to_end(key)
+            return result
+    
+    def put(self, key: bytes, result: Tuple[float, bool]) -> None:
+        """Store a result, evicting the least recently used beyond maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._scores[key] = result
+            self._scores.move_to_end(key)
+            if len(self._scores) > self.maxsize:
+                self._scores.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._scores.clear()
+
+
+score_cache = ScoreCache(settings.ssh_prediction_cache_size)
+
+# Cached scores are only valid for the model they were computed with
+ssh_lstm_model.add_load_listener(score_cache.clear)
+
+
+def _cached_predict(token_seq: np.ndarray) -> Tuple[float, bool]:
+    """LSTM score for a token window, memoized in score_cache."""
+    key = token_seq.tobytes()
+    result = score_cache.get(key)
+    if result is None:
+        result = ssh_lstm_model.predict(token_seq)
+        score_cache.put(key, result)
+    return result
 
 
 def parse_auth_line(line: str) -> Tuple[Optional[str], Optional[str]]:
@@ -103,18 +270,27 @@ def parse_auth_line(line: str) -> Tuple[Optional[str], Optional[str]]:
     """
     # Extract token type
     token_name = "OTHER"
-    for pattern, token in TOKEN_PATTERNS:
-        if re.search(pattern, line, re.IGNORECASE):
-            token_name = token
-            break
+    if line.isascii():
+        lowered = line.lower()
+        for literal, pattern, token in TOKEN_MATCHERS:
+            if (literal in lowered) if literal is not None else pattern.search(line):
+                token_name = token
+                break
+    else:
+        for pattern, token in TOKEN_PATTERNS:
+            if pattern.search(line):
+                token_name = token
+                break
     
-    # Extract source IP
+    # Extract source IP (every pattern needs a dotted quad, so lines without
+    # a "." - session open/close, cron - skip the searches)
     src_ip = None
-    for pattern in IP_PATTERNS:
-        match = re.search(pattern, line)
-        if match:
-            src_ip = match.group(1)
-            break
+    if "." in line:
+        for pattern in IP_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                src_ip = match.group(1)
+                break
     
     return token_name, src_ip
 
@@ -130,6 +306,67 @@ def analyze_auth_event(line: str, timestamp: datetime = None) -> Optional[Dict[s
     Returns:
         Detection dict if anomaly detected, None otherwise
     """
+    event = _track_auth_event(line, timestamp)
+    if event is None:
+        return None
+    
+    token_seq = event[2]
+    model_result = _cached_predict(token_seq) if token_seq is not None else (0.0, False)
+    return _build_detection(line, event, model_result)
+
+
+def analyze_auth_events_batch(
+    events: List[Tuple[str, Optional[datetime]]]
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Analyze many auth.log lines, scoring all uncached token windows with a
+    single model call.
+    
+    Args:
+        events: (line, timestamp) pairs, tracked in list order
+    
+    Returns:
+        One entry per event: detection dict if anomaly detected, None otherwise
+    """
+    tracked = [_track_auth_event(line, timestamp) for line, timestamp in events]
+    
+    # Cache hits are answered directly; each distinct missing window is scored once
+    model_results: List[Tuple[float, bool]] = [(0.0, False)] * len(events)
+    missing: Dict[bytes, List[int]] = {}
+    for i, event in enumerate(tracked):
+        if event is None or event[2] is None:
+            continue
+        key = event[2].tobytes()
+        cached = score_cache.get(key)
+        if cached is not None:
+            model_results[i] = cached
+        else:
+            missing.setdefault(key, []).append(i)
+    
+    if missing:
+        rows = list(missing.values())
+        scored = ssh_lstm_model.predict_batch([tracked[indices[0]][2] for indices in rows])
+        for (key, indices), result in zip(missing.items(), scored):
+            score_cache.put(key, result)
+            for i in indices:
+                model_results[i] = result
+    
+    return [
+        _build_detection(line, event, result) if event is not None else None
+        for (line, _), event, result in zip(events, tracked, model_results)
+    ]
+
+
+def _track_auth_event(
+    line: str, timestamp: Optional[datetime]
+) -> Optional[Tuple[str, str, Optional[np.ndarray], int]]:
+    """
+    Parse a line and record it in the tracker.
+    
+    Returns:
+        (token_name, src_ip, token window to score or None, failed count),
+        or None if the line has no source IP
+    """
     if timestamp is None:
         timestamp = datetime.utcnow()
     
@@ -146,35 +383,53 @@ def analyze_auth_event(line: str, timestamp: datetime = None) -> Optional[Dict[s
     else:
         token_id = 0
     
-    # Track the event
-    ssh_tracker.add_event(src_ip, token_id, timestamp)
+    use_model = ssh_lstm_model.loaded and ssh_lstm_model.model is not None
+    token_seq = None
+    
+    # Events may be analyzed from worker threads: update and read this IP's
+    # tracker shard under its lock; the model runs outside it
+    epoch = to_epoch_seconds(timestamp)
+    tracker, tracker_lock = ssh_tracker.shard_for(src_ip)
+    with tracker_lock:
+        # Track the event
+        tracker.add_event(src_ip, token_id, epoch)
+        
+        # Track failed attempts
+        if token_name in FAILED_TOKENS:
+            tracker.add_failed_attempt(src_ip, epoch)
+        
+        if use_model:
+            token_seq = tracker.get_token_sequence(src_ip, ssh_lstm_model.window_size)
+        
+        failed_count = tracker.get_failed_count_in_window(
+            src_ip, 
+            epoch, 
+            ssh_lstm_model.time_window_sec if ssh_lstm_model.loaded else 300
+        )
     
-    # Track failed attempts
-    if token_name in ["FAILED_PASSWORD", "INVALID_USER", "PAM_AUTH_FAILURE"]:
-        ssh_tracker.add_failed_attempt(src_ip, timestamp)
+    if token_seq is not None and len(token_seq) < 3:  # Need some history
+        token_seq = None
+    
+    return token_name, src_ip, token_seq, failed_count
+
+
+def _build_detection(
+    line: str,
+    event: Tuple[str, str, Optional[np.ndarray], int],
+    model_result: Tuple[float, bool]
+) -> Optional[Dict[str, Any]]:
+    """Combine a tracked event and its model result into a detection, if anomalous."""
+    token_name, src_ip, _, failed_count = event
     
     # Check for anomalies
     is_anomaly = False
-    anomaly_score = 0.0
-    failed_count = 0
     
     # 1. Model-based detection
-    if ssh_lstm_model.loaded and ssh_lstm_model.model is not None:
-        token_seq = ssh_tracker.get_token_sequence(src_ip, ssh_lstm_model.window_size)
-        if len(token_seq) >= 3:  # Need some history
-            anomaly_score, is_model_anomaly = ssh_lstm_model.predict(token_seq)
-            if is_model_anomaly:
-                is_anomaly = True
-    else:
-        is_model_anomaly = False
+    anomaly_score, is_model_anomaly = model_result
+    if is_model_anomaly:
+        is_anomaly = True
     
     # 2. Threshold-based detection (failed attempts)
-    failed_count = ssh_tracker.get_failed_count_in_window(
-        src_ip, 
-        timestamp, 
-        ssh_lstm_model.time_window_sec if ssh_lstm_model.loaded else 300
-    )
-    
     fail_threshold = ssh_lstm_model.fail_threshold if ssh_lstm_model.loaded else 5
     if failed_count >= fail_threshold:
         is_anomaly = True
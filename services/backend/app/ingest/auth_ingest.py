@@ -3,26 +3,26 @@ Analytical-Intelligence v1 - Auth Event Ingestion
 """
 
 import logging
-from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_session, ensure_device, insert_raw_event, insert_detection
 from app.security import verify_api_key
 from app.schemas import AuthEventPayload, IngestResponse
-from app.detectors.ssh_lstm_detector import analyze_auth_event
+from app.detectors.ssh_batcher import ssh_batcher
+from app.ingest.batcher import event_writer
+from app.ingest.timestamps import parse_event_timestamp
+from app.ingest.routing import IngestRoute
+from app.models_loader import wait_for_models
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/v1/ingest", tags=["ingestion"])
+router = APIRouter(prefix="/api/v1/ingest", tags=["ingestion"], route_class=IngestRoute)
 
 
 @router.post("/auth", response_model=IngestResponse)
 async def ingest_auth_event(
     payload: AuthEventPayload,
-    api_key: str = Depends(verify_api_key),
-    session: AsyncSession = Depends(get_session)
+    api_key: str = Depends(verify_api_key)
 ):
     """
     Ingest an auth.log event.
@@ -30,51 +30,32 @@ async def ingest_auth_event(
     """
     try:
         # Parse timestamp
-        if payload.timestamp:
-            try:
-                ts = datetime.fromisoformat(payload.timestamp.replace("Z", "+00:00"))
-            except:
-                ts = datetime.utcnow()
-        else:
-            ts = datetime.utcnow()
+        ts = parse_event_timestamp(payload.timestamp)
         
-        # Ensure device exists
-        await ensure_device(session, payload.device_id, payload.hostname, payload.device_ip)
-        
-        # Store raw event
         event_payload = {
             "line": payload.line,
             "hostname": payload.hostname,
             "device_ip": payload.device_ip,
         }
         
-        event_id = await insert_raw_event(
-            session,
+        # Run SSH LSTM detection
+        await wait_for_models()
+        # Scored together with concurrent auth events, off the event loop
+        detection = await ssh_batcher.analyze(payload.line, ts)
+        
+        # Store raw event and detection (batched with concurrent requests)
+        event_id, detection_id = await event_writer.write(
             ts=ts,
             device_id=payload.device_id,
+            hostname=payload.hostname,
+            device_ip=payload.device_ip,
             event_type="auth",
-            payload=event_payload
+            payload=event_payload,
+            detection=detection
         )
         
-        # Run SSH LSTM detection
-        detection_id = None
-        detection = analyze_auth_event(payload.line, ts)
-        
         if detection:
-            detection_id = await insert_detection(
-                session,
-                ts=ts,
-                device_id=payload.device_id,
-                raw_event_id=event_id,
-                model_name=detection["model_name"],
-                label=detection["label"],
-                score=detection["score"],
-                severity=detection["severity"],
-                details=detection["details"]
-            )
-            logger.info(f"SSH detection: {detection['label']} from {payload.device_id}")
-        
-        await session.commit()
+            logger.info("SSH detection: %s from %s", detection["label"], payload.device_id)
 
         return IngestResponse(
             status="accepted",
@@ -84,6 +65,5 @@ async def ingest_auth_event(
         )
 
     except Exception as e:
-        await session.rollback()
         logger.error(f"Auth ingestion error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,137 @@
+"""
+Analytical-Intelligence v1 - Ingest Batch Writer
+Stores events from concurrent ingest requests in shared transactions.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.config import settings
+from app.coalescer import Coalescer
+from app.db import (
+    async_session_factory,
+    ensure_devices,
+    reserve_ids,
+    insert_raw_events,
+    insert_detections,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PendingEvent:
+    """An event (and its detection, if any) waiting to be written."""
+    
+    __slots__ = ("ts", "device_id", "hostname", "device_ip", "event_type", "payload", "detection")
+    
+    def __init__(
+        self,
+        ts: datetime,
+        device_id: str,
+        hostname: Optional[str],
+        device_ip: Optional[str],
+        event_type: str,
+        payload: Dict[str, Any],
+        detection: Optional[Dict[str, Any]]
+    ):
+        self.ts = ts
+        self.device_id = device_id
+        self.hostname = hostname
+        self.device_ip = device_ip
+        self.event_type = event_type
+        self.payload = payload
+        self.detection = detection
+
+
+class EventWriter(Coalescer[PendingEvent, Tuple[int, Optional[int]]]):
+    """
+    Buffers ingested events and writes each buffer in one transaction:
+    one device upsert, one raw_events insert and one detections insert,
+    instead of three statements and a commit per event.
+    
+    Callers await their own (event_id, detection_id), so responses still
+    report stored IDs. A batch rejected for its data (a constraint or
+    invalid value) is retried one transaction per event, so a bad event only
+    fails its own request. Any other failure, e.g. the database being
+    unreachable, fails the batch at once rather than adding a transaction
+    per event while the database is down.
+    """
+    
+    retry_on = (IntegrityError, DataError)
+    
+    async def write(
+        self,
+        ts: datetime,
+        device_id: str,
+        hostname: Optional[str],
+        device_ip: Optional[str],
+        event_type: str,
+        payload: Dict[str, Any],
+        detection: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Store an event and its detection; returns (event_id, detection_id)."""
+        return await self.submit(
+            PendingEvent(ts, device_id, hostname, device_ip, event_type, payload, detection)
+        )
+    
+    async def process_batch(self, events: List[PendingEvent]) -> List[Tuple[int, Optional[int]]]:
+        """Write events in a single transaction; returns (event_id, detection_id) per event."""
+        # Last write wins per device, as with per-event upserts in arrival order
+        devices = {
+            event.device_id: {"device_id": event.device_id, "hostname": event.hostname, "ip": event.device_ip}
+            for event in events
+        }
+        detected = [event for event in events if event.detection]
+        
+        async with async_session_factory() as session:
+            try:
+                await ensure_devices(session, list(devices.values()))
+                
+                event_ids = await reserve_ids(session, "raw_events", len(events))
+                await insert_raw_events(session, [
+                    {
+                        "id": event_id,
+                        "ts": event.ts,
+                        "device_id": event.device_id,
+                        "event_type": event.event_type,
+                        "payload": event.payload,
+                    }
+                    for event, event_id in zip(events, event_ids)
+                ])
+                
+                detection_ids: Dict[int, int] = {}
+                if detected:
+                    raw_ids = {id(event): event_id for event, event_id in zip(events, event_ids)}
+                    reserved = await reserve_ids(session, "detections", len(detected))
+                    await insert_detections(session, [
+                        {
+                            "id": detection_id,
+                            "ts": event.ts,
+                            "device_id": event.device_id,
+                            "raw_event_id": raw_ids[id(event)],
+                            "model_name": event.detection["model_name"],
+                            "label": event.detection["label"],
+                            "score": event.detection["score"],
+                            "severity": event.detection["severity"],
+                            "details": event.detection["details"],
+                        }
+                        for event, detection_id in zip(detected, reserved)
+                    ])
+                    detection_ids = {id(event): detection_id for event, detection_id in zip(detected, reserved)}
+                
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        
+        return [
+            (event_id, detection_ids.get(id(event)))
+            for event, event_id in zip(events, event_ids)
+        ]
+
+
+# Global writer used by the ingest endpoints
+event_writer = EventWriter(settings.ingest_batch_size, settings.ingest_batch_max_delay_ms)
@@ -3,26 +3,26 @@ Analytical-Intelligence v1 - Flow Event Ingestion
 """
 
 import logging
-from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_session, ensure_device, insert_raw_event, insert_detection
 from app.security import verify_api_key
 from app.schemas import FlowEventPayload, IngestResponse
-from app.detectors.network_ml_detector import analyze_flow
+from app.detectors.flow_batcher import flow_batcher
+from app.ingest.batcher import event_writer
+from app.ingest.timestamps import parse_event_timestamp
+from app.ingest.routing import IngestRoute
+from app.models_loader import wait_for_models
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/v1/ingest", tags=["ingestion"])
+router = APIRouter(prefix="/api/v1/ingest", tags=["ingestion"], route_class=IngestRoute)
 
 
 @router.post("/flow", response_model=IngestResponse)
 async def ingest_flow_event(
     payload: FlowEventPayload,
-    api_key: str = Depends(verify_api_key),
-    session: AsyncSession = Depends(get_session)
+    api_key: str = Depends(verify_api_key)
 ):
     """
     Ingest a network flow event.
@@ -30,45 +30,25 @@ async def ingest_flow_event(
     """
     try:
         # Parse timestamp
-        if payload.timestamp:
-            try:
-                ts = datetime.fromisoformat(payload.timestamp.replace("Z", "+00:00"))
-            except:
-                ts = datetime.utcnow()
-        else:
-            ts = datetime.utcnow()
+        ts = parse_event_timestamp(payload.timestamp)
         
-        # Ensure device exists
-        await ensure_device(session, payload.device_id, payload.hostname, payload.device_ip)
+        # Run ML detection
+        await wait_for_models()
+        detection = await flow_batcher.analyze(payload.flow)
         
-        # Store raw event
-        event_id = await insert_raw_event(
-            session,
+        # Store raw event and detection (batched with concurrent requests)
+        event_id, detection_id = await event_writer.write(
             ts=ts,
             device_id=payload.device_id,
+            hostname=payload.hostname,
+            device_ip=payload.device_ip,
             event_type="flow",
-            payload=payload.flow
+            payload=payload.flow,
+            detection=detection
         )
         
-        # Run ML detection
-        detection_id = None
-        detection = analyze_flow(payload.flow)
-        
         if detection:
-            detection_id = await insert_detection(
-                session,
-                ts=ts,
-                device_id=payload.device_id,
-                raw_event_id=event_id,
-                model_name=detection["model_name"],
-                label=detection["label"],
-                score=detection["score"],
-                severity=detection["severity"],
-                details=detection["details"]
-            )
-            logger.info(f"Network ML detection: {detection['label']} ({detection['severity']})")
-        
-        await session.commit()
+            logger.info("Network ML detection: %s (%s)", detection["label"], detection["severity"])
 
         return IngestResponse(
             status="accepted",
@@ -78,6 +58,5 @@ async def ingest_flow_event(
         )
 
     except Exception as e:
-        await session.rollback()
         logger.error(f"Flow ingestion error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
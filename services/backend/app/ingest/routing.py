@@ -0,0 +1,73 @@
+"""
+Analytical-Intelligence v1 - Ingest Route Class
+Decodes ingest request bodies with orjson when it is installed, and tracks
+ingest requests in flight so shutdown can wait for them.
+"""
+
+import asyncio
+from typing import Any, Callable, List
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Ingest requests being handled, and the shutdown waiters for that to reach 0
+_in_flight = 0
+_idle_waiters: List[asyncio.Future] = []
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson (about 3x faster on eve.json events)."""
+    
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+            # still answers malformed bodies with a 422
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class IngestRoute(APIRoute):
+    """
+    APIRoute that hands endpoints an ORJSONRequest (plain Request without
+    orjson) and counts the requests in flight.
+    """
+    
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+        
+        async def route_handler(request: Request) -> Response:
+            global _in_flight
+            if orjson is not None:
+                request = ORJSONRequest(request.scope, request.receive)
+            _in_flight += 1
+            try:
+                return await original_route_handler(request)
+            finally:
+                _in_flight -= 1
+                if _in_flight == 0:
+                    _wake_idle_waiters()
+        
+        return route_handler
+
+
+async def wait_for_ingest_requests() -> None:
+    """Wait until no ingest request is being handled."""
+    if _in_flight == 0:
+        return
+    future = asyncio.get_running_loop().create_future()
+    _idle_waiters.append(future)
+    await future
+
+
+def _wake_idle_waiters() -> None:
+    """Release everything waiting in wait_for_ingest_requests."""
+    waiters = _idle_waiters[:]
+    _idle_waiters.clear()
+    for future in waiters:
+        if not future.done():
+            future.set_result(None)
@@ -3,26 +3,25 @@ Analytical-Intelligence v1 - Suricata Event Ingestion
 """
 
 import logging
-from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_session, ensure_device, insert_raw_event, insert_detection
 from app.security import verify_api_key
 from app.schemas import SuricataEventPayload, IngestResponse
 from app.detectors.severity import get_suricata_severity
+from app.ingest.batcher import event_writer
+from app.ingest.timestamps import parse_event_timestamp
+from app.ingest.routing import IngestRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/v1/ingest", tags=["ingestion"])
+router = APIRouter(prefix="/api/v1/ingest", tags=["ingestion"], route_class=IngestRoute)
 
 
 @router.post("/suricata", response_model=IngestResponse)
 async def ingest_suricata_event(
     payload: SuricataEventPayload,
-    api_key: str = Depends(verify_api_key),
-    session: AsyncSession = Depends(get_session)
+    api_key: str = Depends(verify_api_key)
 ):
     """
     Ingest a Suricata eve.json event.
@@ -30,27 +29,9 @@ async def ingest_suricata_event(
     """
     try:
         # Parse timestamp
-        if payload.timestamp:
-            try:
-                ts = datetime.fromisoformat(payload.timestamp.replace("Z", "+00:00"))
-            except:
-                ts = datetime.utcnow()
-        else:
-            ts = datetime.utcnow()
+        ts = parse_event_timestamp(payload.timestamp)
         
-        # Ensure device exists
-        await ensure_device(session, payload.device_id, payload.hostname, payload.device_ip)
-        
-        # Store raw event
-        event_id = await insert_raw_event(
-            session,
-            ts=ts,
-            device_id=payload.device_id,
-            event_type="suricata",
-            payload=payload.event
-        )
-        
-        detection_id = None
+        detection = None
         
         # Create detection for alert events
         event = payload.event
@@ -84,21 +65,27 @@ async def ingest_suricata_event(
                 "proto": event.get("proto"),
             }
             
-            detection_id = await insert_detection(
-                session,
-                ts=ts,
-                device_id=payload.device_id,
-                raw_event_id=event_id,
-                model_name="suricata",
-                label=label[:255],  # Truncate if needed
-                score=1.0,
-                severity=severity,
-                details=details
-            )
-            
-            logger.info(f"Suricata detection: {signature[:50]} ({severity})")
+            detection = {
+                "model_name": "suricata",
+                "label": label[:255],  # Truncate if needed
+                "score": 1.0,
+                "severity": severity,
+                "details": details,
+            }
+        
+        # Store raw event and detection (batched with concurrent requests)
+        event_id, detection_id = await event_writer.write(
+            ts=ts,
+            device_id=payload.device_id,
+            hostname=payload.hostname,
+            device_ip=payload.device_ip,
+            event_type="suricata",
+            payload=event,
+            detection=detection
+        )
         
-        await session.commit()
+        if detection:
+            logger.info("Suricata detection: %s (%s)", signature[:50], severity)
 
         return IngestResponse(
             status="accepted",
@@ -108,7 +95,6 @@ async def ingest_suricata_event(
         )
 
     except Exception as e:
-        await session.rollback()
         logger.error(f"Suricata ingestion error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
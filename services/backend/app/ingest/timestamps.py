@@ -0,0 +1,31 @@
+"""
+Analytical-Intelligence v1 - Event Timestamp Parsing
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+
+def parse_event_timestamp(value: Optional[str]) -> datetime:
+    """
+    Parse an agent-supplied ISO-8601 timestamp.
+    Falls back to the current UTC time when it is missing or invalid.
+    """
+    if not value:
+        return datetime.utcnow()
+    
+    ts = _parse_iso(value)
+    return ts if ts is not None else datetime.utcnow()
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> Optional[datetime]:
+    """
+    Memoized fromisoformat: events from one sensor arrive in bursts that share
+    timestamps (auth.log has 1s resolution), and datetimes are immutable.
+    """
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
@@ -3,19 +3,25 @@ Analytical-Intelligence v1 - Main Application
 FastAPI backend with Jinja2 templates
 """
 
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.models_loader import load_all_models
+from app.models_loader import start_loading_models, models_loading
 from app.schemas import HealthResponse
 from app.ui import router as ui_router
 from app.ingest import auth_router, suricata_router, flow_router
+from app.ingest.batcher import event_writer
+from app.ingest.routing import wait_for_ingest_requests
+from app.detectors.flow_batcher import flow_batcher
+from app.detectors.ssh_batcher import ssh_batcher
 
 # Configure logging
 logging.basicConfig(
@@ -25,16 +31,15 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan handler."""
-    # Startup
-    logger.info("=" * 50)
-    logger.info("Analytical-Intelligence v1 Starting...")
-    logger.info("=" * 50)
+def _log_model_status(task: asyncio.Task):
+    """Log which models loaded once the background load finishes."""
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.error(f"Model loading failed: {task.exception()}")
+        return
     
-    # Load ML models
-    ssh_loaded, network_loaded = load_all_models()
+    ssh_loaded, network_loaded = task.result()
     
     logger.info("-" * 50)
     logger.info("Model Status:")
@@ -44,6 +49,19 @@ async def lifespan(app: FastAPI):
     
     if not ssh_loaded and not network_loaded:
         logger.warning("No ML models loaded - only Suricata detection will work")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan handler."""
+    # Startup
+    logger.info("=" * 50)
+    logger.info("Analytical-Intelligence v1 Starting...")
+    logger.info("=" * 50)
+    
+    # Load ML models in the background so the port opens immediately; health
+    # reports "warming" and model-backed ingest waits until they are ready
+    start_loading_models().add_done_callback(_log_model_status)
     
     logger.info(f"Backend running on {settings.backend_host}:{settings.backend_port}")
     logger.info("=" * 50)
@@ -52,6 +70,15 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Analytical-Intelligence v1 Shutting down...")
+    # Flush everything buffered; once drained, the batchers and the writer
+    # process later submissions right away
+    await flow_batcher.drain()
+    await ssh_batcher.drain()
+    await event_writer.drain()
+    # Handlers resumed by the drains (or still waiting on something else, e.g.
+    # model loading) queue their writes later, so wait for them all to finish
+    await wait_for_ingest_requests()
+    await event_writer.drain()
 
 
 # Create FastAPI app
@@ -72,12 +99,25 @@ app.include_router(suricata_router)
 app.include_router(flow_router)
 
 
+# (epoch second, ISO string) for health responses; rebuilt at most once per second
+_health_timestamp = (0, "")
+
+
+def _current_timestamp() -> str:
+    """Current UTC time as an ISO string, second resolution (cached per second)."""
+    global _health_timestamp
+    now = int(time.time())
+    if now != _health_timestamp[0]:
+        _health_timestamp = (now, datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+    return _health_timestamp[1]
+
+
 @app.get("/api/v1/health", response_model=HealthResponse, tags=["system"])
 async def health_check():
     """Health check endpoint."""
     return HealthResponse(
-        status="ok",
-        timestamp=datetime.utcnow().isoformat() + "Z",
+        status="warming" if models_loading() else "ok",
+        timestamp=_current_timestamp(),
         version="1.0.0"
     )
 
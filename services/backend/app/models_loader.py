@@ -5,15 +5,79 @@ Gracefully loads ML models with fallback behavior.
 
 import os
 import json
+import asyncio
+import hashlib
 import logging
-from typing import Optional, Dict, Any, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
 
 import numpy as np
 
 from app.config import settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# ONNX Runtime input element types the SSH LSTM export may declare
+ONNX_INPUT_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(int32)": np.int32,
+    "tensor(int64)": np.int64,
+}
+
+# Network feature rows are float64, as the model was trained on: narrowing
+# large features (FlowDuration in us, Flow Bytes/s) to float32 can move a
+# value across a tree split threshold and change the prediction
+FEATURE_DTYPE = np.float64
+
+# ONNX metadata key holding the sha256 of the joblib bundle an export was made from
+ONNX_SOURCE_HASH_KEY = "source_sha256"
+
+
+def read_json(path: str) -> Any:
+    """Read a JSON model artifact (orjson when installed)."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def file_sha256(path: str) -> str:
+    """Hex sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def onnx_export_is_current(session, model_path: str, onnx_path: str) -> bool:
+    """
+    Whether an ONNX export was made from the joblib bundle at model_path.
+    The export scripts record the bundle's sha256 in the ONNX metadata; an
+    export without it, or from another bundle, is stale and is not used.
+    """
+    source_hash = session.get_modelmeta().custom_metadata_map.get(ONNX_SOURCE_HASH_KEY)
+    if source_hash is None:
+        logger.warning(f"{onnx_path} does not record its source bundle - re-export it; ignoring")
+        return False
+    if source_hash != file_sha256(model_path):
+        logger.warning(f"{onnx_path} was exported from a different {model_path} - re-export it; ignoring")
+        return False
+    return True
+
+
+def binary_to_columns(positive: np.ndarray) -> np.ndarray:
+    """Expand binary P(class 1) scores into (N, 2) class probability columns."""
+    positive = np.asarray(positive)
+    return np.column_stack((1.0 - positive, positive))
+
 
 # =====================================================
 # SSH LSTM Model Loader
@@ -31,12 +95,27 @@ class SSHLSTMModel:
         self.time_window_sec: int = 300
         self.threshold: float = 0.5
         self.loaded: bool = False
+        # "onnx" when scoring through an ONNX Runtime export, else "keras"
+        self.backend: str = "keras"
+        self._predict_scores = None
+        # Element type the backend consumes; per-thread input windows are kept in it
+        self._input_dtype = np.float32
+        self._window_buffers = threading.local()
+        self._load_listeners: list = []
     
-    def load(self, model_path: str) -> bool:
-        """Load the SSH LSTM model from joblib."""
+    def add_load_listener(self, callback) -> None:
+        """Register a callback run after every successful load (e.g. to reset caches)."""
+        self._load_listeners.append(callback)
+    
+    def load(self, model_path: str, onnx_path: Optional[str] = None) -> bool:
+        """
+        Load the SSH LSTM model from joblib.
+        When an ONNX export exists at onnx_path it is used for scoring and
+        TensorFlow is not needed; the joblib bundle still supplies the vocabulary
+        and thresholds.
+        """
         try:
             import joblib
-            from tensorflow.keras.models import model_from_json
             
             if not os.path.exists(model_path):
                 logger.warning(f"SSH LSTM model not found at {model_path}")
@@ -53,9 +132,6 @@ class SSHLSTMModel:
             if not model_json or not weights:
                 raise ValueError("Invalid SSH LSTM model bundle")
         
-            self.model = model_from_json(model_json)
-            self.model.set_weights(weights)
-        
             self.token2id = bundle.get("token2id", {})
             self.window_size = bundle.get("window_size", 10)
             self.stride = bundle.get("stride", 1)
@@ -63,11 +139,25 @@ class SSHLSTMModel:
             self.time_window_sec = bundle.get("time_window_sec", 300)
             self.threshold = bundle.get("threshold", 0.5)
         
+            onnx_session = self._load_onnx_session(onnx_path, model_path)
+            if onnx_session is not None:
+                self.model, self._predict_scores = onnx_session
+                self.backend = "onnx"
+            else:
+                self.model = self._load_keras(model_path, model_json, weights)
+                self._predict_scores = self._compile_keras() or self._predict_keras
+                self._input_dtype = np.float32
+                self.backend = "keras"
+        
             self.loaded = True
             logger.info(f"SSH LSTM model loaded successfully from {model_path}")
             logger.info(f"  - Tokens: {len(self.token2id)}")
             logger.info(f"  - Window size: {self.window_size}")
             logger.info(f"  - Threshold: {self.threshold}")
+            logger.info(f"  - Backend: {self.backend}")
+            
+            for callback in self._load_listeners:
+                callback()
             return True
         
         except Exception as e:
@@ -84,27 +174,173 @@ class SSHLSTMModel:
         if not self.loaded or self.model is None:
             return 0.0, False
         
+        # Last window_size tokens, left-padded with zeros, written into this
+        # thread's reused input buffer in the backend's dtype
+        window = self._window_buffer()
+        count = min(len(token_sequence), self.window_size)
+        window[:self.window_size - count] = 0
+        if count:
+            window[self.window_size - count:] = token_sequence[-count:]
+        
+        # Only the backend call can fail
         try:
-            # Ensure correct shape
-            if len(token_sequence) < self.window_size:
-                # Pad with zeros
-                padded = np.zeros(self.window_size, dtype=np.int32)
-                padded[-len(token_sequence):] = token_sequence
-                token_sequence = padded
-            
-            # Take last window_size tokens
-            X = token_sequence[-self.window_size:].reshape(1, self.window_size, 1)
+            pred = self._predict_scores(window[np.newaxis])
+        except Exception as e:
+            logger.error(f"SSH LSTM prediction error: {e}")
+            return 0.0, False
+        
+        score = float(np.max(pred))
+        return score, score >= self.threshold
+    
+    def predict_batch(self, token_sequences: List[np.ndarray]) -> List[Tuple[float, bool]]:
+        """
+        Predict anomaly scores for many token sequences in one forward pass.
+        Returns one (score, is_anomaly) per sequence, as predict would.
+        """
+        count = len(token_sequences)
+        if not self.loaded or self.model is None or count == 0:
+            return [(0.0, False)] * count
+        
+        # One left-padded window per row, as in predict
+        windows = np.zeros((count, self.window_size), dtype=self._input_dtype)
+        for window, token_sequence in zip(windows, token_sequences):
+            length = min(len(token_sequence), self.window_size)
+            if length:
+                window[self.window_size - length:] = token_sequence[-length:]
+        
+        try:
+            pred = self._predict_scores(windows)
+        except Exception as e:
+            logger.error(f"SSH LSTM batch prediction error: {e}")
+            return [(0.0, False)] * count
+        
+        # Scores as float64, so the threshold test matches predict's exactly
+        scores = np.max(np.asarray(pred).reshape(count, -1), axis=1).astype(np.float64)
+        return list(zip(scores.tolist(), (scores >= self.threshold).tolist()))
+    
+    def _load_keras(self, model_path: str, model_json: str, weights: list):
+        """
+        Build the Keras model. A native .keras file next to the bundle
+        (scripts/export_ssh_keras.py) loads in one pass, so it is preferred when
+        its .sha256 sidecar matches the bundle; otherwise the model is rebuilt
+        from JSON + weights. Nothing is written to the models directory.
+        """
+        from tensorflow.keras.models import load_model, model_from_json
+        
+        keras_path = os.path.splitext(model_path)[0] + ".keras"
+        if os.path.exists(keras_path):
+            if self._keras_export_is_current(keras_path, model_path):
+                logger.info(f"Loading SSH LSTM from {keras_path}")
+                return load_model(keras_path, compile=False)
+            logger.warning(f"{keras_path} was not exported from {model_path} - re-export it; ignoring")
+        
+        model = model_from_json(model_json)
+        model.set_weights(weights)
+        return model
+    
+    @staticmethod
+    def _keras_export_is_current(keras_path: str, model_path: str) -> bool:
+        """Whether the .keras export's sidecar records the current bundle's sha256."""
+        try:
+            with open(keras_path + ".sha256", "r") as f:
+                return f.read().strip() == file_sha256(model_path)
+        except OSError:
+            return False
+    
+    def _window_buffer(self) -> np.ndarray:
+        """Return this thread's (window_size,) input buffer, reallocated if the model changed."""
+        window = getattr(self._window_buffers, "window", None)
+        if window is None or window.shape[0] != self.window_size or window.dtype != self._input_dtype:
+            window = np.zeros(self.window_size, dtype=self._input_dtype)
+            self._window_buffers.window = window
+        return window
+    
+    def _compile_keras(self):
+        """
+        Trace the Keras forward pass once as a tf.function (XLA-compiled when
+        supported) and warm it up at load, so per-event calls run a cached
+        graph. Returns a score callable, or None to call the model eagerly.
+        """
+        import tensorflow as tf
+        
+        model = self.model
+        window_size = self.window_size
+        # The batch dimension is left open so single windows and batches share one trace
+        signature = [tf.TensorSpec((None, window_size, 1), tf.float32)]
+        for jit_compile in (True, False):
+            infer = tf.function(
+                lambda x: model(x, training=False), input_signature=signature, jit_compile=jit_compile
+            )
+            try:
+                infer(tf.zeros((1, window_size, 1), dtype=tf.float32))
+            except Exception as e:
+                logger.warning(f"SSH LSTM tf.function (jit_compile={jit_compile}) unavailable: {e}")
+                continue
             
-            # Predict
-            pred = self.model.predict(X, verbose=0)
-            score = float(np.max(pred))
-            is_anomaly = score >= self.threshold
+            def predict_scores(windows: np.ndarray, infer=infer) -> np.ndarray:
+                X = tf.constant(windows.reshape(-1, window_size, 1), dtype=tf.float32)
+                return infer(X).numpy()
             
-            return score, is_anomaly
+            return predict_scores
+        
+        return None
+    
+    def _predict_keras(self, windows: np.ndarray) -> np.ndarray:
+        """Score (n, window_size) token windows with the Keras model."""
+        X = windows.reshape(-1, self.window_size, 1)
+        # Calling the model directly skips predict()'s per-call data adapter,
+        # dataset and callback setup, which dominates for small batches
+        return np.asarray(self.model(X, training=False))
+    
+    def _load_onnx_session(self, onnx_path: Optional[str], model_path: str):
+        """
+        Build (session, score callable) for an ONNX Runtime export, or None to
+        use Keras (no export, or one that does not match the bundle).
+        """
+        if not onnx_path or not os.path.exists(onnx_path):
+            return None
+        
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            logger.warning(f"onnxruntime not installed - ignoring {onnx_path}")
+            return None
+        
+        try:
+            options = ort.SessionOptions()
+            # Small batches per call; a single intra-op thread avoids pool hand-off cost
+            options.intra_op_num_threads = settings.ssh_onnx_threads
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(
+                onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            model_input = session.get_inputs()[0]
+            input_name = model_input.name
+            # Exports keep the Keras input signature: (batch, window) or (batch, window, 1)
+            input_shape = (-1, self.window_size) + (1,) * (len(model_input.shape) - 2)
+            input_dtype = ONNX_INPUT_DTYPES.get(model_input.type, np.float32)
             
+            if not onnx_export_is_current(session, model_path, onnx_path):
+                return None
+            # Symbolic (str/None) dimensions accept any window size
+            window_dim = model_input.shape[1]
+            if isinstance(window_dim, int) and window_dim != self.window_size:
+                logger.warning(
+                    f"{onnx_path} expects windows of {window_dim} tokens, "
+                    f"bundle uses {self.window_size}; ignoring"
+                )
+                return None
         except Exception as e:
-            logger.error(f"SSH LSTM prediction error: {e}")
-            return 0.0, False
+            logger.error(f"Failed to load ONNX SSH LSTM model from {onnx_path}: {e}")
+            return None
+        
+        def predict_scores(windows: np.ndarray) -> np.ndarray:
+            X = windows.astype(input_dtype, copy=False).reshape(input_shape)
+            return session.run(None, {input_name: X})[0]
+        
+        self._input_dtype = input_dtype
+        logger.info(f"SSH LSTM ONNX session loaded from {onnx_path}")
+        return session, predict_scores
 
 
 # =====================================================
@@ -119,18 +355,40 @@ class NetworkMLModel:
         self.feature_list: list = []
         self.label_map: Dict[str, int] = {}
         self.inverse_label_map: Dict[int, str] = {}
+        self.normalized_labels: Dict[str, str] = {}
+        self.known_labels: frozenset = frozenset()
+        # Label for each column of predict_proba output
+        self.class_labels: Tuple[str, ...] = ()
         self.median_map: Dict[str, float] = {}
         self.columns_to_clip: list = []
+        self.n_features: int = 0
+        self.threshold_by_id: np.ndarray = np.empty(0, dtype=np.float64)
+        # Preprocess config resolved into feature_list order
+        self.median_vector: np.ndarray = np.empty(0, dtype=FEATURE_DTYPE)
+        self.clip_indices: np.ndarray = np.empty(0, dtype=np.intp)
+        self.clip_max: np.ndarray = np.empty(0, dtype=FEATURE_DTYPE)
         self.loaded: bool = False
+        self._predict_proba = None
+        self.backend: str = "native"
+        self._load_listeners: list = []
+    
+    def add_load_listener(self, callback) -> None:
+        """Register a callback run after every successful load (e.g. to reset caches)."""
+        self._load_listeners.append(callback)
     
     def load(
         self,
         model_path: str,
         features_path: str,
         labels_path: str,
-        preprocess_path: str
+        preprocess_path: str,
+        onnx_path: Optional[str] = None
     ) -> bool:
-        """Load the network ML model and its artifacts."""
+        """
+        Load the network ML model and its artifacts.
+        If an ONNX export exists at onnx_path and onnxruntime is installed,
+        inference runs through ONNX Runtime instead of the native estimator.
+        """
         try:
             import joblib
             
@@ -143,55 +401,226 @@ class NetworkMLModel:
             # Load model
             self.model = joblib.load(model_path)
             
+            # sklearn estimators expose predict_proba; a raw LightGBM Booster
+            # returns class probabilities from predict() for multiclass objectives
+            self._predict_proba = getattr(self.model, "predict_proba", None) or self.model.predict
+            self.backend = "native"
+            
             # Load feature list
-            with open(features_path, "r") as f:
-                self.feature_list = json.load(f)
+            self.feature_list = read_json(features_path)
+            self.n_features = len(self.feature_list)
             
             # Load label map
-            with open(labels_path, "r") as f:
-                self.label_map = json.load(f)
-                self.inverse_label_map = {v: k for k, v in self.label_map.items()}
+            self.label_map = read_json(labels_path)
+            self.inverse_label_map = {v: k for k, v in self.label_map.items()}
+            self.normalized_labels = {k: k.strip().upper() for k in self.label_map}
+            self.known_labels = frozenset(self.label_map)
+            
+            self.class_labels = self._resolve_class_labels()
+            self.threshold_by_id = self._build_threshold_table()
+            
+            # Checked against the features and labels above, so loaded after them
+            onnx_predict = self._load_onnx_session(onnx_path, model_path)
+            if onnx_predict is not None:
+                self._predict_proba = onnx_predict
+                self.backend = "onnxruntime"
             
             # Load preprocess config
-            with open(preprocess_path, "r") as f:
-                preprocess = json.load(f)
-                self.median_map = preprocess.get("median_map", {})
-                self.columns_to_clip = preprocess.get("columns_to_clip", [])
+            preprocess = read_json(preprocess_path)
+            self.median_map = preprocess.get("median_map", {})
+            self.columns_to_clip = preprocess.get("columns_to_clip", [])
+            
+            self.median_vector = np.array(
+                [self.median_map.get(name, 0.0) for name in self.feature_list],
+                dtype=FEATURE_DTYPE
+            )
+            self.clip_indices = np.array(
+                [i for i, name in enumerate(self.feature_list) if name in self.columns_to_clip],
+                dtype=np.intp
+            )
+            # Clip to 10x median as a safe upper bound
+            self.clip_max = np.array(
+                [max(self.median_map.get(self.feature_list[i], 0.0) * 10, 1e6) for i in self.clip_indices],
+                dtype=FEATURE_DTYPE
+            )
+            
+            self._warm_up()
             
             self.loaded = True
             logger.info(f"Network ML model loaded successfully")
             logger.info(f"  - Features: {len(self.feature_list)}")
             logger.info(f"  - Labels: {list(self.label_map.keys())}")
+            logger.info(f"  - Backend: {self.backend}")
+            
+            for callback in self._load_listeners:
+                callback()
             return True
             
         except Exception as e:
             logger.error(f"Failed to load Network ML model: {e}")
             return False
     
-    def predict(self, features: np.ndarray) -> Tuple[str, float, np.ndarray]:
+    def _load_onnx_session(self, onnx_path: Optional[str], model_path: str):
         """
-        Predict attack class for feature vector.
-        Returns (label_name, confidence, all_probabilities).
+        Build an ONNX Runtime predict_proba callable, or None to keep the native
+        model (no export, or one that does not match the bundle and artifacts).
         """
-        if not self.loaded or self.model is None:
-            return "UNKNOWN", 0.0, np.array([])
+        if not onnx_path or not os.path.exists(onnx_path):
+            return None
         
         try:
-            # Reshape if needed
-            if features.ndim == 1:
-                features = features.reshape(1, -1)
-            
-            # Get probabilities
-            proba = self.model.predict_proba(features)[0]
-            label_id = int(np.argmax(proba))
-            score = float(proba[label_id])
-            label_name = self.inverse_label_map.get(label_id, "UNKNOWN")
+            import onnxruntime as ort
+        except ImportError:
+            logger.warning(f"onnxruntime not installed - ignoring {onnx_path}")
+            return None
+        
+        try:
+            options = ort.SessionOptions()
+            # Flow batches are small; a single intra-op thread avoids pool hand-off cost
+            options.intra_op_num_threads = settings.network_onnx_threads
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(
+                onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            model_input = session.get_inputs()[0]
+            input_name = model_input.name
+            # Classifier exports emit (label, probabilities); probabilities come last
+            proba_name = session.get_outputs()[-1].name
             
-            return label_name, score, proba
+            if not onnx_export_is_current(session, model_path, onnx_path):
+                return None
             
+            # Scores are read against feature_list and class_labels, so the
+            # export must take the same features and emit the same columns
+            feature_dim = model_input.shape[-1]
+            if isinstance(feature_dim, int) and feature_dim != self.n_features:
+                logger.warning(
+                    f"{onnx_path} expects {feature_dim} features, "
+                    f"feature list has {self.n_features}; ignoring"
+                )
+                return None
+            probe = session.run(
+                [proba_name], {input_name: np.zeros((1, self.n_features), dtype=np.float32)}
+            )[0]
+            if probe.shape != (1, len(self.class_labels)):
+                logger.warning(
+                    f"{onnx_path} outputs {probe.shape[-1]} classes, "
+                    f"model has {len(self.class_labels)}; ignoring"
+                )
+                return None
+        except Exception as e:
+            logger.error(f"Failed to load ONNX network model from {onnx_path}: {e}")
+            return None
+        
+        def predict_proba(features: np.ndarray) -> np.ndarray:
+            # ONNX tree ensembles only take float32 input; opting into this
+            # backend accepts that rounding (the native model gets float64)
+            return session.run([proba_name], {input_name: features.astype(np.float32)})[0]
+        
+        logger.info(f"Network ML ONNX session loaded from {onnx_path}")
+        return predict_proba
+    
+    def _warm_up(self) -> None:
+        """
+        Run one inference on the median row so lazy backend initialisation
+        (thread pools, ONNX Runtime kernels) happens at load, not on the first flow.
+        The output shape is checked here too, so predict never has to.
+        """
+        try:
+            probe = np.asarray(self._predict_proba(self.median_vector.reshape(1, -1)))
+        except Exception as e:
+            logger.warning(f"Network ML warm-up inference failed: {e}")
+            return
+        
+        # A Booster trained with a binary objective returns only P(class 1) per
+        # row; expand it once here so every caller sees (N, classes) columns
+        if probe.ndim == 1:
+            positive_proba = self._predict_proba
+            self._predict_proba = lambda features: binary_to_columns(positive_proba(features))
+    
+    def _resolve_class_labels(self) -> Tuple[str, ...]:
+        """
+        Label name for each probability column, in the model's column order.
+        sklearn estimators report their column order in classes_ (label ids or
+        label names); a LightGBM Booster's columns are the label ids themselves.
+        """
+        classes = getattr(self.model, "classes_", None)
+        if classes is None:
+            size = max(self.label_map.values()) + 1 if self.label_map else 0
+            return tuple(self.inverse_label_map.get(i, str(i)) for i in range(size))
+        
+        return tuple(
+            c if isinstance(c, str) else self.inverse_label_map.get(int(c), str(c))
+            for c in classes.tolist()
+        )
+    
+    def _build_threshold_table(self) -> np.ndarray:
+        """
+        Resolve per-label detection thresholds into an array indexed by class column.
+        Kept as float64 so configured values compare exactly against probabilities.
+        """
+        table = np.full(len(self.class_labels), settings.network_ml_threshold, dtype=np.float64)
+        for label, threshold in settings.network_ml_label_thresholds.items():
+            if label not in self.class_labels:
+                logger.warning(f"Ignoring threshold for unknown network label: {label}")
+                continue
+            table[self.class_labels.index(label)] = threshold
+        return table
+    
+    def decode_label(self, class_index: int) -> str:
+        """Label name for a probability column, "UNKNOWN" if it has none."""
+        # A column outside class_labels means the model and label map disagree
+        labels = self.class_labels
+        return labels[class_index] if 0 <= class_index < len(labels) else "UNKNOWN"
+    
+    def predict(self, features: np.ndarray) -> Tuple[int, float, np.ndarray]:
+        """
+        Predict attack class for feature vector.
+        
+        Expects a C-contiguous FEATURE_DTYPE row of shape (1, n_features), as built by
+        map_flow_to_features, so the estimator's input validation is a no-op.
+        Returns (class_index, confidence, all_probabilities); class_index is the
+        probability column (see decode_label) and is -1 when no prediction
+        could be made.
+        """
+        if not self.loaded or self.model is None:
+            return -1, 0.0, np.array([])
+        
+        # Reshape if needed (1-D callers)
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        
+        # Get probabilities; the output layout was checked at load (_warm_up),
+        # so only the backend call itself is guarded
+        try:
+            proba = self._predict_proba(features)[0]
         except Exception as e:
             logger.error(f"Network ML prediction error: {e}")
-            return "UNKNOWN", 0.0, np.array([])
+            return -1, 0.0, np.array([])
+        
+        label_id = int(np.argmax(proba))
+        return label_id, float(proba[label_id]), proba
+    
+    def predict_many(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predict attack classes for an (N, n_features) matrix in one model call.
+        Returns (label_ids, confidences, probabilities); label_ids are -1 when
+        no prediction could be made.
+        """
+        count = len(features)
+        failed = (np.full(count, -1, dtype=np.intp), np.zeros(count), np.empty((count, 0)))
+        if not self.loaded or self.model is None:
+            return failed
+        
+        try:
+            proba = np.asarray(self._predict_proba(features))
+        except Exception as e:
+            logger.error(f"Network ML batch prediction error: {e}")
+            return failed
+        
+        label_ids = proba.argmax(axis=1)
+        scores = proba[np.arange(count), label_ids]
+        return label_ids, scores, proba
 
 
 # =====================================================
@@ -206,24 +635,59 @@ def load_all_models():
     """Load all ML models at startup."""
     logger.info("Loading ML models...")
     
-    # Load SSH LSTM
-    ssh_loaded = ssh_lstm_model.load(settings.ssh_model_path)
+    # The two models are independent and their loads are mostly file I/O and
+    # native deserialization, so they run side by side
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-load") as executor:
+        ssh_future = executor.submit(
+            ssh_lstm_model.load, settings.ssh_model_path, settings.ssh_onnx_path
+        )
+        network_future = executor.submit(
+            network_ml_model.load,
+            settings.network_model_path,
+            settings.network_features_path,
+            settings.network_labels_path,
+            settings.network_preprocess_path,
+            settings.network_onnx_path
+        )
+        ssh_loaded = ssh_future.result()
+        network_loaded = network_future.result()
+    
     if not ssh_loaded:
         logger.warning("SSH LSTM model not loaded - SSH detection will be limited")
     
-    # Load Network ML
-    network_loaded = network_ml_model.load(
-        settings.network_model_path,
-        settings.network_features_path,
-        settings.network_labels_path,
-        settings.network_preprocess_path
-    )
     if not network_loaded:
         logger.warning("Network ML model not loaded - flow classification will be disabled")
     
     return ssh_loaded, network_loaded
 
 
+# Background load started by start_loading_models (None when loading synchronously)
+_load_task: Optional[asyncio.Task] = None
+
+
+def start_loading_models() -> asyncio.Task:
+    """
+    Run load_all_models in a worker thread so the server can accept requests
+    (health checks) while models deserialize. Returns the task, whose result is
+    load_all_models()'s (ssh_loaded, network_loaded).
+    """
+    global _load_task
+    _load_task = asyncio.ensure_future(asyncio.to_thread(load_all_models))
+    return _load_task
+
+
+def models_loading() -> bool:
+    """True while a background model load is still running."""
+    return _load_task is not None and not _load_task.done()
+
+
+async def wait_for_models() -> None:
+    """Wait for a running background load, so early events still get model detection."""
+    if models_loading():
+        # Shielded: a cancelled request must not cancel the load itself
+        await asyncio.shield(_load_task)
+
+
 def get_models_status() -> Dict[str, Any]:
     """Get status of all loaded models."""
     return {
@@ -234,11 +698,13 @@ def get_models_status() -> Dict[str, Any]:
             "threshold": ssh_lstm_model.threshold,
             "fail_threshold": ssh_lstm_model.fail_threshold,
             "time_window_sec": ssh_lstm_model.time_window_sec,
+            "backend": ssh_lstm_model.backend if ssh_lstm_model.loaded else None,
         },
         "network_ml": {
             "loaded": network_ml_model.loaded,
             "features_count": len(network_ml_model.feature_list) if network_ml_model.loaded else 0,
             "labels": list(network_ml_model.label_map.keys()) if network_ml_model.loaded else [],
             "labels_count": len(network_ml_model.label_map) if network_ml_model.loaded else 0,
+            "backend": network_ml_model.backend if network_ml_model.loaded else None,
         }
     }
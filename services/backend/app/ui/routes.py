@@ -4,7 +4,7 @@ Server-rendered HTML pages using Jinja2 templates.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import HTMLResponse
@@ -138,14 +138,15 @@ async def models_page(request: Request):
     })
 
 
-# JSON API endpoints for polling
-@router.get("/api/v1/stats")
+# JSON API endpoints for polling. A response_model lets FastAPI serialize the
+# result straight to JSON bytes with Pydantic instead of jsonable_encoder + json.dumps
+@router.get("/api/v1/stats", response_model=Dict[str, Any])
 async def api_stats(session: AsyncSession = Depends(get_session)):
     """Get dashboard stats as JSON."""
     return await get_stats(session)
 
 
-@router.get("/api/v1/recent-detections")
+@router.get("/api/v1/recent-detections", response_model=List[Dict[str, Any]])
 async def api_recent_detections(
     limit: int = Query(10, ge=1, le=50),
     session: AsyncSession = Depends(get_session)
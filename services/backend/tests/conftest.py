@@ -0,0 +1,25 @@
+"""
+Analytical-Intelligence v1 - Shared test fixtures
+"""
+
+import os
+
+import pytest
+
+from app.config import settings
+from app.models_loader import network_ml_model
+
+
+@pytest.fixture(scope="session")
+def network_model():
+    """The shipped network model, loaded once (skips when the artifacts are absent)."""
+    if not os.path.exists(settings.network_model_path):
+        pytest.skip("network model not available")
+    if not network_ml_model.loaded:
+        assert network_ml_model.load(
+            settings.network_model_path,
+            settings.network_features_path,
+            settings.network_labels_path,
+            settings.network_preprocess_path,
+        )
+    return network_ml_model
@@ -0,0 +1,100 @@
+"""
+Analytical-Intelligence v1 - Request coalescing tests
+Run from services/backend: python -m pytest tests
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.coalescer import Coalescer
+from app.detectors.ssh_batcher import SSHBatcher
+
+# The package re-exports the ssh_batcher instance under the module's name
+ssh_batcher_module = importlib.import_module("app.detectors.ssh_batcher")
+
+
+class RecordingCoalescer(Coalescer):
+    """Echoes items back from a worker thread, recording processing order and overlap."""
+    
+    def __init__(self, max_batch: int, max_delay_ms: float, ordered: bool):
+        super().__init__(max_batch, max_delay_ms, ordered=ordered)
+        self.seen = []
+        self.active = 0
+        self.overlapped = False
+        self._lock = threading.Lock()
+    
+    async def process_batch(self, items):
+        def work():
+            with self._lock:
+                self.active += 1
+                self.overlapped |= self.active > 1
+            # Earlier batches take longer, so unordered batches would finish out of order
+            time.sleep(0.02 if items[0] < 8 else 0.001)
+            with self._lock:
+                self.seen.extend(items)
+                self.active -= 1
+            return items
+        return await asyncio.to_thread(work)
+
+
+def test_ordered_batches_run_one_at_a_time_in_arrival_order():
+    coalescer = RecordingCoalescer(max_batch=4, max_delay_ms=5.0, ordered=True)
+    
+    async def run():
+        return await asyncio.gather(*(coalescer.submit(i) for i in range(32)))
+    
+    assert asyncio.run(run()) == list(range(32))
+    assert coalescer.seen == list(range(32))
+    assert not coalescer.overlapped
+
+
+def test_unordered_batches_may_overlap():
+    coalescer = RecordingCoalescer(max_batch=4, max_delay_ms=5.0, ordered=False)
+    
+    async def run():
+        return await asyncio.gather(*(coalescer.submit(i) for i in range(32)))
+    
+    # Results still reach the right callers
+    assert asyncio.run(run()) == list(range(32))
+    assert coalescer.overlapped
+
+
+def test_drain_processes_buffered_items():
+    coalescer = RecordingCoalescer(max_batch=100, max_delay_ms=60_000.0, ordered=True)
+    
+    async def run():
+        pending = asyncio.ensure_future(coalescer.submit(7))
+        await asyncio.sleep(0)
+        await coalescer.drain()
+        return pending.done() and pending.result()
+    
+    assert asyncio.run(run()) == 7
+
+
+def test_failed_ssh_batch_gives_no_detection_instead_of_failing(monkeypatch):
+    def broken(events):
+        raise RuntimeError("tracker failure")
+    
+    monkeypatch.setattr(ssh_batcher_module, "analyze_auth_events_batch", broken)
+    batcher = SSHBatcher(max_batch=3, max_delay_ms=5.0)
+    
+    async def run():
+        return await asyncio.gather(*(
+            batcher.analyze(f"sshd[1]: Failed password for root from 10.0.0.{i} port 22", datetime(2026, 1, 1))
+            for i in range(3)
+        ))
+    
+    assert asyncio.run(run()) == [None, None, None]
+
+
+def test_subclass_without_process_batch_fails_at_creation():
+    class Incomplete(Coalescer):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete(max_batch=4, max_delay_ms=5.0)
@@ -0,0 +1,40 @@
+"""
+Analytical-Intelligence v1 - jsonb serialization tests
+Run from services/backend: python -m pytest tests
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from app import db
+
+PAYLOAD = {
+    "score": float("nan"),
+    "rates": [1.5, float("inf"), np.float32(2.5), np.array([np.nan, 1.0])],
+    "count": np.int64(3),
+    "window": (1, float("-inf")),
+    "label": "ok",
+}
+
+
+def test_fallback_writes_null_for_non_finite_floats(monkeypatch):
+    monkeypatch.setattr(db, "orjson", None)
+    
+    # allow_nan=False would raise on any NaN/Infinity left in the payload
+    assert json.loads(db.dumps_json(PAYLOAD)) == {
+        "score": None,
+        "rates": [1.5, None, 2.5, [None, 1.0]],
+        "count": 3,
+        "window": [1, None],
+        "label": "ok",
+    }
+
+
+@pytest.mark.skipif(db.orjson is None, reason="orjson is not installed")
+def test_fallback_matches_orjson(monkeypatch):
+    expected = json.loads(db.dumps_json(PAYLOAD))
+    monkeypatch.setattr(db, "orjson", None)
+    
+    assert json.loads(db.dumps_json(PAYLOAD)) == expected
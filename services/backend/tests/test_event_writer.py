@@ -0,0 +1,137 @@
+"""
+Analytical-Intelligence v1 - Ingest batch writer tests
+Run from services/backend: python -m pytest tests
+"""
+
+import asyncio
+import importlib
+import itertools
+from datetime import datetime
+
+from sqlalchemy.exc import DataError, OperationalError
+
+from app.ingest.batcher import EventWriter
+
+batcher_module = importlib.import_module("app.ingest.batcher")
+
+DETECTION = {
+    "model_name": "ssh_lstm",
+    "label": "ssh_bruteforce",
+    "score": 0.9,
+    "severity": "high",
+    "details": {},
+}
+
+
+class FakeSession:
+    """Stands in for an AsyncSession, recording commits and rollbacks."""
+    
+    def __init__(self, db):
+        self.db = db
+    
+    async def __aenter__(self):
+        self.db.transactions += 1
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def commit(self):
+        self.db.commits += 1
+    
+    async def rollback(self):
+        self.db.rollbacks += 1
+
+
+class FakeDB:
+    """Replaces the batch insert helpers; fail(rows) decides whether a raw_events insert fails."""
+    
+    def __init__(self, fail=lambda rows: None):
+        self.fail = fail
+        self.transactions = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.raw_events = []
+        self.detections = []
+        self._ids = {"raw_events": itertools.count(1), "detections": itertools.count(1)}
+    
+    def install(self, monkeypatch):
+        async def ensure_devices(session, devices):
+            pass
+        
+        async def reserve_ids(session, table, count):
+            return [next(self._ids[table]) for _ in range(count)]
+        
+        async def insert_raw_events(session, rows):
+            error = self.fail(rows)
+            if error is not None:
+                raise error
+            self.raw_events.extend(rows)
+        
+        async def insert_detections(session, rows):
+            self.detections.extend(rows)
+        
+        monkeypatch.setattr(batcher_module, "async_session_factory", lambda: FakeSession(self))
+        monkeypatch.setattr(batcher_module, "ensure_devices", ensure_devices)
+        monkeypatch.setattr(batcher_module, "reserve_ids", reserve_ids)
+        monkeypatch.setattr(batcher_module, "insert_raw_events", insert_raw_events)
+        monkeypatch.setattr(batcher_module, "insert_detections", insert_detections)
+
+
+def write_all(writer, count, detected=()):
+    async def run():
+        return await asyncio.gather(*(
+            writer.write(
+                ts=datetime(2026, 1, 1),
+                device_id="sensor-1",
+                hostname="sensor-1",
+                device_ip="10.0.0.1",
+                event_type="auth",
+                payload={"line": i},
+                detection=DETECTION if i in detected else None,
+            )
+            for i in range(count)
+        ), return_exceptions=True)
+    return asyncio.run(run())
+
+
+def test_batch_is_written_in_one_transaction(monkeypatch):
+    db = FakeDB()
+    db.install(monkeypatch)
+    writer = EventWriter(max_batch=4, max_delay_ms=5.0)
+    
+    results = write_all(writer, 4, detected={1, 3})
+    
+    assert results == [(1, None), (2, 1), (3, None), (4, 2)]
+    assert (db.transactions, db.commits) == (1, 1)
+    assert [row["payload"]["line"] for row in db.raw_events] == [0, 1, 2, 3]
+    assert [row["raw_event_id"] for row in db.detections] == [2, 4]
+
+
+def test_data_error_only_fails_the_bad_event(monkeypatch):
+    def fail(rows):
+        if any(row["payload"]["line"] == 2 for row in rows):
+            return DataError("INSERT", {}, Exception("invalid input"))
+    
+    db = FakeDB(fail)
+    db.install(monkeypatch)
+    writer = EventWriter(max_batch=4, max_delay_ms=5.0)
+    
+    results = write_all(writer, 4)
+    
+    assert isinstance(results[2], DataError)
+    assert [result for i, result in enumerate(results) if i != 2] == [(5, None), (6, None), (8, None)]
+    # One failed batch, then one transaction per event
+    assert db.transactions == 5
+    assert [row["payload"]["line"] for row in db.raw_events] == [0, 1, 3]
+
+
+def test_unreachable_database_fails_the_batch_without_per_event_retries(monkeypatch):
+    db = FakeDB(lambda rows: OperationalError("INSERT", {}, Exception("connection refused")))
+    db.install(monkeypatch)
+    writer = EventWriter(max_batch=4, max_delay_ms=5.0)
+    
+    results = write_all(writer, 4)
+    
+    assert all(isinstance(result, OperationalError) for result in results)
+    assert (db.transactions, db.rollbacks) == (1, 1)
@@ -0,0 +1,50 @@
+"""
+Analytical-Intelligence v1 - Network batch classification tests
+Run from services/backend: python -m pytest tests
+"""
+
+import asyncio
+
+import pytest
+
+from app.detectors.network_ml_detector import analyze_flow, analyze_flows_batch
+from app.detectors.flow_batcher import FlowBatcher
+
+# A slow HTTP flow the shipped model flags as an attack
+ATTACK_FLOW = {
+    "src_ip": "1.2.3.4", "dst_ip": "10.0.0.1", "src_port": 8097, "dst_port": 80, "protocol": 6,
+    "bidirectional_duration_ms": 119000, "bidirectional_packets": 2, "bidirectional_bytes": 3000,
+    "src2dst_packets": 2, "src2dst_bytes": 3000, "dst2src_packets": 0, "dst2src_bytes": 0,
+    "bidirectional_mean_ps": 1500, "bidirectional_stddev_ps": 0,
+    "bidirectional_max_ps": 1500, "bidirectional_min_ps": 1500,
+    "src2dst_mean_ps": 1500, "src2dst_stddev_ps": 0, "src2dst_max_ps": 1500, "src2dst_min_ps": 1500,
+    "dst2src_mean_ps": 0, "dst2src_stddev_ps": 0, "dst2src_max_ps": 0, "dst2src_min_ps": 0,
+}
+
+# Fails feature mapping: a port must be a number
+MALFORMED_FLOW = {"dst_port": [1]}
+
+
+@pytest.fixture(autouse=True)
+def loaded_model(network_model):
+    return network_model
+
+
+def test_malformed_flow_only_loses_its_own_detection():
+    flows = [ATTACK_FLOW, MALFORMED_FLOW, dict(ATTACK_FLOW, src_port=8098)]
+    expected = [analyze_flow(flow) for flow in flows]
+    
+    assert expected[0] is not None and expected[2] is not None
+    assert expected[1] is None
+    assert analyze_flows_batch(flows) == expected
+
+
+def test_batcher_keeps_good_flows_next_to_malformed_one():
+    flows = [ATTACK_FLOW, MALFORMED_FLOW, dict(ATTACK_FLOW, src_port=8098)]
+    batcher = FlowBatcher(max_batch=len(flows), max_delay_ms=1000.0)
+    
+    async def run():
+        return await asyncio.gather(*(batcher.analyze(flow) for flow in flows))
+    
+    results = asyncio.run(run())
+    assert [result is not None for result in results] == [True, False, True]
@@ -0,0 +1,52 @@
+"""
+Analytical-Intelligence v1 - Network feature mapping tests
+Run from services/backend: python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from app.detectors.network_feature_mapper import map_flow_to_features, map_flows_to_features
+from app.detectors.network_ml_detector import analyze_flow, analyze_flows_batch
+from tests.test_network_batch import ATTACK_FLOW
+
+
+@pytest.fixture(autouse=True)
+def loaded_model(network_model):
+    return network_model
+
+
+# Counters NFStream may report as null
+COUNTER_FIELDS = (
+    "bidirectional_duration_ms",
+    "bidirectional_bytes",
+    "bidirectional_packets",
+    "src2dst_packets",
+    "dst2src_packets",
+)
+
+
+@pytest.mark.parametrize("field", COUNTER_FIELDS)
+@pytest.mark.parametrize("value", [None, float("nan")])
+def test_null_counter_maps_the_same_single_and_batched(field, value):
+    flow = dict(ATTACK_FLOW, **{field: value})
+    
+    single = map_flow_to_features(flow)
+    batched = map_flows_to_features([flow])
+    
+    np.testing.assert_array_equal(single, batched)
+    assert analyze_flow(flow) == analyze_flows_batch([flow])[0]
+
+
+def test_null_duration_rates_match_zero_duration(network_model):
+    # A null duration makes per-second rates "not computable", as a zero one does
+    rates = [
+        network_model.feature_list.index(name)
+        for name in ("FlowBytes/s", "FlowPackets/s", "FwdPackets/s", "BwdPackets/s")
+        if name in network_model.feature_list
+    ]
+    null_duration = map_flow_to_features(dict(ATTACK_FLOW, bidirectional_duration_ms=None))
+    zero_duration = map_flow_to_features(dict(ATTACK_FLOW, bidirectional_duration_ms=0))
+    
+    assert rates
+    np.testing.assert_array_equal(null_duration[:, rates], zero_duration[:, rates])
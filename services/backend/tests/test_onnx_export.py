@@ -0,0 +1,96 @@
+"""
+Analytical-Intelligence v1 - ONNX export validation tests
+Run from services/backend: python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from app.models_loader import ONNX_SOURCE_HASH_KEY, NetworkMLModel, file_sha256
+
+ort = pytest.importorskip("onnxruntime")
+
+N_FEATURES = 4
+CLASS_LABELS = ("BENIGN", "DDoS", "PortScan")
+
+
+class FakeNode:
+    def __init__(self, name, shape):
+        self.name = name
+        self.shape = shape
+
+
+class FakeMeta:
+    def __init__(self, custom_metadata_map):
+        self.custom_metadata_map = custom_metadata_map
+
+
+def fake_session(metadata, n_features=N_FEATURES, n_classes=len(CLASS_LABELS)):
+    """An InferenceSession stand-in for a classifier export with the given shape and metadata."""
+    class FakeSession:
+        def __init__(self, *args, **kwargs):
+            pass
+        
+        def get_modelmeta(self):
+            return FakeMeta(metadata)
+        
+        def get_inputs(self):
+            return [FakeNode("input", [None, n_features])]
+        
+        def get_outputs(self):
+            return [FakeNode("label", [None]), FakeNode("probabilities", [None, n_classes])]
+        
+        def run(self, output_names, feed):
+            rows = feed["input"].shape[0]
+            return [np.full((rows, n_classes), 1.0 / n_classes, dtype=np.float32)]
+    
+    return FakeSession
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    """(model_path, onnx_path) for a bundle and an export file on disk."""
+    model_path = tmp_path / "model.joblib"
+    model_path.write_bytes(b"bundle")
+    onnx_path = tmp_path / "model.onnx"
+    onnx_path.write_bytes(b"export")
+    return str(model_path), str(onnx_path)
+
+
+def load_session(monkeypatch, artifacts, session_class):
+    monkeypatch.setattr(ort, "InferenceSession", session_class)
+    model = NetworkMLModel()
+    model.n_features = N_FEATURES
+    model.class_labels = CLASS_LABELS
+    return model._load_onnx_session(artifacts[1], artifacts[0])
+
+
+def test_export_of_this_bundle_is_used(monkeypatch, artifacts):
+    session = fake_session({ONNX_SOURCE_HASH_KEY: file_sha256(artifacts[0])})
+    predict_proba = load_session(monkeypatch, artifacts, session)
+    
+    assert predict_proba is not None
+    assert predict_proba(np.zeros((2, N_FEATURES))).shape == (2, len(CLASS_LABELS))
+
+
+@pytest.mark.parametrize("metadata", [{}, {ONNX_SOURCE_HASH_KEY: "0" * 64}], ids=["unstamped", "stale"])
+def test_export_not_made_from_this_bundle_is_ignored(monkeypatch, artifacts, metadata):
+    assert load_session(monkeypatch, artifacts, fake_session(metadata)) is None
+
+
+@pytest.mark.parametrize(
+    "n_features, n_classes",
+    [(N_FEATURES + 1, len(CLASS_LABELS)), (N_FEATURES, len(CLASS_LABELS) - 1)],
+    ids=["features", "classes"]
+)
+def test_export_with_other_inputs_or_classes_is_ignored(monkeypatch, artifacts, n_features, n_classes):
+    session = fake_session({ONNX_SOURCE_HASH_KEY: file_sha256(artifacts[0])}, n_features, n_classes)
+    
+    assert load_session(monkeypatch, artifacts, session) is None
+
+
+def test_missing_export_keeps_the_native_model(monkeypatch, artifacts, tmp_path):
+    monkeypatch.setattr(ort, "InferenceSession", fake_session({}))
+    model = NetworkMLModel()
+    
+    assert model._load_onnx_session(str(tmp_path / "absent.onnx"), artifacts[0]) is None
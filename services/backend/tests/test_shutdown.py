@@ -0,0 +1,69 @@
+"""
+Analytical-Intelligence v1 - Graceful shutdown tests
+Run from services/backend: python -m pytest tests
+"""
+
+import asyncio
+import importlib
+import time
+
+import httpx
+
+from app import main
+from app.config import settings
+from app.detectors import flow_batcher, ssh_batcher
+from app.ingest.batcher import EventWriter, event_writer
+
+auth_ingest = importlib.import_module("app.ingest.auth_ingest")
+ssh_batcher_module = importlib.import_module("app.detectors.ssh_batcher")
+
+
+def test_shutdown_waits_for_handlers_before_the_last_writer_drain(monkeypatch):
+    stored = []
+    
+    async def slow_models():
+        # Still loading when shutdown starts, so the handler queues its work after the drains
+        await asyncio.sleep(0.05)
+    
+    async def record(self, events):
+        stored.extend(event.payload["line"] for event in events)
+        return [(i, None) for i in range(len(events))]
+    
+    async def no_models():
+        return False, False
+    
+    monkeypatch.setattr(auth_ingest, "wait_for_models", slow_models)
+    monkeypatch.setattr(ssh_batcher_module, "analyze_auth_events_batch", lambda events: [None] * len(events))
+    monkeypatch.setattr(EventWriter, "process_batch", record)
+    monkeypatch.setattr(main, "start_loading_models", lambda: asyncio.ensure_future(no_models()))
+    # Without the drains, nothing would be flushed before the test ends
+    for coalescer in (flow_batcher, ssh_batcher, event_writer):
+        monkeypatch.setattr(coalescer, "max_delay", 60.0)
+        monkeypatch.setattr(coalescer, "_draining", False)
+    
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            lifespan = main.lifespan(main.app)
+            await lifespan.__aenter__()
+            requests = [
+                asyncio.ensure_future(client.post(
+                    "/api/v1/ingest/auth",
+                    headers={"INGEST_API_KEY": settings.ingest_api_key},
+                    json={"device_id": "d1", "hostname": "h", "device_ip": "10.0.0.1", "line": f"line {i}"},
+                ))
+                for i in range(2)
+            ]
+            await asyncio.sleep(0.01)
+            started = time.monotonic()
+            await lifespan.__aexit__(None, None, None)
+            elapsed = time.monotonic() - started
+            stored_at_shutdown = sorted(stored)
+            responses = await asyncio.gather(*requests)
+        return stored_at_shutdown, [response.status_code for response in responses], elapsed
+    
+    stored_at_shutdown, statuses, elapsed = asyncio.run(run())
+    
+    assert stored_at_shutdown == ["line 0", "line 1"]
+    assert statuses == [200, 200]
+    assert elapsed < 5.0
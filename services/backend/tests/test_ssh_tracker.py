@@ -0,0 +1,51 @@
+"""
+Analytical-Intelligence v1 - SSH event tracker tests
+Run from services/backend: python -m pytest tests
+"""
+
+from app.detectors.ssh_lstm_detector import SSHEventTracker
+
+IP = "10.0.0.5"
+
+
+def test_late_failed_attempts_are_counted_in_their_own_window():
+    tracker = SSHEventTracker()
+    for ts in (1000.0, 5000.0, 1010.0, 1020.0):
+        tracker.add_failed_attempt(IP, ts)
+    
+    assert list(tracker.ips[IP].failed) == [1010.0, 1020.0, 5000.0]
+    assert tracker.get_failed_count_in_window(IP, 5000.0, 60) == 1
+    # A late event sees the attempts around it, not the newer one at 5000
+    assert tracker.get_failed_count_in_window(IP, 1030.0, 60) == 2
+
+
+def test_failed_window_excludes_its_start_and_includes_its_end():
+    tracker = SSHEventTracker()
+    for ts in (940.0, 940.5, 1000.0, 1000.5):
+        tracker.add_failed_attempt(IP, ts)
+    
+    # Window is (940, 1000]: 940 is out, 940.5 and 1000 are in, 1000.5 is later
+    assert tracker.get_failed_count_in_window(IP, 1000.0, 60) == 2
+
+
+def test_unknown_ip_has_no_failed_attempts():
+    assert SSHEventTracker().get_failed_count_in_window(IP, 1000.0, 60) == 0
+
+
+def test_late_events_are_inserted_in_time_order():
+    tracker = SSHEventTracker()
+    for ts, token_id in ((100.0, 1), (300.0, 3), (200.0, 2), (300.0, 4), (100.0, 5)):
+        tracker.add_event(IP, token_id, ts)
+    
+    # Late events go after existing events with the same timestamp
+    assert list(tracker.ips[IP].tokens) == [(100.0, 1), (100.0, 5), (200.0, 2), (300.0, 3), (300.0, 4)]
+    assert tracker.get_token_sequence(IP, 3).tolist() == [2, 3, 4]
+
+
+def test_history_an_hour_old_is_pruned():
+    tracker = SSHEventTracker()
+    tracker.add_event(IP, 1, 0.0)
+    tracker.add_event(IP, 2, 3600.0)
+    
+    # Exactly HISTORY_SEC old is already stale
+    assert tracker.get_token_sequence(IP, 20).tolist() == [2]